@@ -2,15 +2,132 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import json
 import os
-from kiteconnect import KiteConnect
+from kiteconnect import KiteConnect, KiteTicker
+from kiteconnect import exceptions as kite_exceptions
+from kiteconnect.exceptions import TokenException
+from urllib3.util.retry import Retry
 import pandas as pd
+import numpy as np
 import threading
 import time
 from datetime import datetime, timedelta
 import webbrowser
 from threading import Thread, Event
 import math
-from collections import Counter
+import random
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+import csv
+import atexit
+import queue
+import io
+try:
+    # C-extension parser for the hot LTP path; stdlib json when it is not installed
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Static lookup for the order-type strings offered in the order forms
+ORDER_TYPES = {
+    'MARKET': KiteConnect.ORDER_TYPE_MARKET,
+    'LIMIT': KiteConnect.ORDER_TYPE_LIMIT,
+}
+
+# Fixed part of every order this app places: regular NRML orders
+ORDER_DEFAULTS = {
+    'variety': KiteConnect.VARIETY_REGULAR,
+    'product': KiteConnect.PRODUCT_NRML,
+}
+
+# HTTPAdapter settings for KiteConnect's requests.Session: enough pooled keep-alive
+# connections for the live-data loops, order workers and P&L thread to share.
+# Retry's default allowed_methods excludes POST, so only idempotent reads are retried.
+KITE_HTTP_POOL = {
+    'pool_connections': 8,
+    'pool_maxsize': 16,
+    'max_retries': Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                         raise_on_status=False),
+}
+
+# Parsed kite.instruments() dumps, one file per exchange per day
+INSTRUMENT_CACHE_DIR = '.instrument_cache'
+
+# Instrument dump columns the app reads; the rest of the CSV is never parsed
+INSTRUMENT_COLUMNS = ['instrument_token', 'tradingsymbol', 'name', 'expiry', 'strike',
+                      'lot_size', 'instrument_type']
+
+# Trading-tab exchange -> exchange of its instrument dump, and of its underlying's quote.
+# NSE stock options trade on NFO; their underlyings are quoted on NSE.
+DUMP_EXCHANGES = {'MCX': 'MCX', 'NFO': 'NFO', 'NSE': 'NFO'}
+UNDERLYING_EXCHANGES = {'MCX': 'MCX', 'NFO': 'NSE', 'NSE': 'NSE'}
+
+# instrument_type -> contract kind; every futures/options filter reads the precomputed 'kind' column
+INSTRUMENT_KINDS = {'FUT': 'FUT', 'CE': 'OPT', 'PE': 'OPT'}
+
+# Seconds a fetched LTP is reused before get_current_price goes back to the API
+QUOTE_TTL = 0.5
+
+# Sentinel for int32 quote columns that have not received a tick yet
+QUOTE_UNSET = np.iinfo(np.int32).min
+
+# Seconds a successful kite.profile() check vouches for the saved access token
+PROFILE_CHECK_TTL = 300
+
+# Live-table row tag for each sign of change %
+CHANGE_TAGS = {1: ('up',), 0: (), -1: ('down',)}
+
+# Order postbacks kept for watch_order before the oldest are dropped; also caps the
+# orders still waiting on a postback
+ORDER_UPDATE_BACKLOG = 500
+
+# Postback statuses after which a watched order can no longer be rejected
+ORDER_SETTLED = {'OPEN', 'COMPLETE', 'CANCELLED', 'REJECTED'}
+
+# Seconds a kite.positions() snapshot is shared by the positions, P&L and trailing readers
+POSITIONS_TTL = 1.0
+
+# Milliseconds a positions refresh waits so a burst of fills is fetched once
+POSITIONS_REFRESH_DELAY = 200
+
+# Seconds between batch order submissions; Kite accepts 10 orders per second
+ORDER_INTERVAL = 0.1
+
+# Kite's per-connection instrument limit, also the largest subscribe frame we send
+TICKER_BATCH = 3000
+
+# Ceiling in seconds for the jittered retry delay of the polling loops
+MAX_BACKOFF = 60
+
+TRADE_LOG_FILE = 'trade_log.csv'
+TRADE_LOG_HEADER = ['timestamp', 'exchange', 'tradingsymbol', 'transaction_type',
+                    'quantity', 'order_type', 'price', 'order_id']
+
+# Both legs of a spread entry/exit go in one row; buy_/sell_ name the legs as entered
+SPREAD_LOG_FILE = 'spread_log.csv'
+SPREAD_LOG_HEADER = ['timestamp', 'action', 'exchange',
+                     'buy_symbol', 'buy_qty', 'buy_order_type', 'buy_price', 'buy_order_id',
+                     'sell_symbol', 'sell_qty', 'sell_order_type', 'sell_price', 'sell_order_id',
+                     'combined_pnl']
+
+def _backoff_sleep(delay):
+    """Sleep for delay plus up to 25% jitter and return the next, doubled delay"""
+    time.sleep(delay + random.uniform(0, delay * 0.25))
+    return min(delay * 2, MAX_BACKOFF)
+
+def _change_percent(ltp, change):
+    """Percent change versus previous close (ltp - net_change) over NumPy arrays, 0 where undefined"""
+    prev_close = ltp - change
+    out = np.zeros_like(ltp)
+    np.divide(change * 100, prev_close, out=out, where=prev_close != 0)
+    return out
+
+class FastKiteTicker(KiteTicker):
+    """KiteTicker whose socket skips autobahn's UTF-8 check on incoming text frames"""
+    def _create_connection(self, url, **kwargs):
+        super()._create_connection(url, **kwargs)
+        # Ticks arrive as binary frames; the text frames are Kite's own JSON postbacks, so
+        # validating every byte of them is pure overhead on the reactor thread
+        self.factory.setProtocolOptions(utf8validateIncoming=False)
 
 class ZerodhaTradingApp:
     def __init__(self, root):
@@ -21,6 +138,11 @@ class ZerodhaTradingApp:
         # Initialize variables
         self.kite = None
         self.is_logged_in = False
+        self.login_time = None
+        self.profile_checked_at = None
+        self.user_name = None
+        # Last credentials dict read from or written to disk
+        self.saved_credentials = None
         self.live_data = {}
         self.positions = {}
         self.orders = {}
@@ -49,7 +171,62 @@ class ZerodhaTradingApp:
         # Real-time price tracking
         self.price_update_event = Event()
         self.current_prices = {}
+        self.price_timestamps = {}
         self.real_time_windows = []
+        # Name of the order executor currently placing orders, None when idle; claimed under
+        # the lock because the P&L thread's auto exit competes with the Tk callbacks for it
+        self.active_order_batch = None
+        self.order_batch_lock = threading.Lock()
+        
+        # Shared success notice and its pending hide job
+        self.toast_label = None
+        self.toast_job = None
+        
+        # Live-data row updates waiting for the next Tk idle pass
+        self.pending_tree_updates = {}
+        self.pending_tree_tags = {}
+        self.tree_update_lock = threading.Lock()
+        self.tree_flush_scheduled = False
+        # Per-table row index and quote columns for the live-data loops
+        self.live_table_stores = {}
+        # Widget path of the selected notebook tab; only that tab's live table is polled.
+        # Set from the notebook once setup_gui has built it
+        self.visible_tab = None
+        # Pending debounced table rebuilds, keyed by refresh method name
+        self.refresh_jobs = {}
+        
+        # WebSocket (KiteTicker) streaming
+        self.kws = None
+        self.ticker_connected = False
+        self.token_to_symbol = {}
+        self.symbol_tokens = {'MCX': {}, 'NFO': {}}
+        # Row-position indexes per exchange, stored as (frame, index) so a lookup only uses an
+        # index built for the very frame it is filtering
+        self.symbol_prefix_index = {}
+        self.name_index = {}
+        # Date each exchange's dump and indexes were built for
+        self.instruments_loaded_on = {}
+        self.order_price_tokens = []
+        # Latest postback per order id, least recently updated first so the oldest is evicted
+        self.order_updates = OrderedDict()
+        # order_id -> (symbol, log function) for placed orders whose postback is still due, oldest first
+        self.watched_orders = OrderedDict()
+        self.order_update_lock = threading.Lock()
+        self.order_pace_lock = threading.Lock()
+        self.next_order_at = 0.0
+        
+        # Worker pool for independent broker calls (order legs, instrument dumps)
+        self.io_executor = ThreadPoolExecutor(max_workers=4)
+        
+        # Log lines waiting for the next Tk idle pass, keyed by text widget attribute
+        self.pending_logs = {}
+        self.log_lock = threading.Lock()
+        self.log_flush_scheduled = False
+        
+        # Trade log (appended per order from worker threads)
+        self.trade_log_lock = threading.Lock()
+        self.trade_log_queue = queue.Queue()
+        self.trade_log_thread = None
         
         # Trailing profit variables
         self.trailing_enabled = False
@@ -57,6 +234,16 @@ class ZerodhaTradingApp:
         self.trailing_type = "points"
         self.trailing_value = 0
         self.trailing_positions = {}
+        self.pnl_label_texts = None
+        self.positions_rows = {}
+        self.positions_refresh_pending = False
+        # Last kite.positions() response and the request in flight, shared by every reader
+        self.positions_lock = threading.Lock()
+        self.positions_snapshot = None
+        self.positions_fetched_at = 0.0
+        self.positions_future = None
+        # Bumped by every order postback; a fetch started under an older generation is not cached
+        self.positions_generation = 0
         
 
         # For MCX options
@@ -76,44 +263,134 @@ class ZerodhaTradingApp:
         
         # Setup GUI
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # Auto login if credentials exist
+        # Auto login if credentials exist; wait for the first paint so the login worker's
+        # instrument parsing does not compete with building the window for the GIL
         if hasattr(self, 'api_key') and hasattr(self, 'access_token'):
-            self.auto_login()
+            self.root.after(0, lambda: self.root.after_idle(self.auto_login))
     
     def load_credentials(self):
         """Load API credentials from file"""
         try:
             if os.path.exists('zerodha_credentials.json'):
-                with open('zerodha_credentials.json', 'r') as f:
-                    creds = json.load(f)
+                with open('zerodha_credentials.json', 'rb') as f:
+                    creds = json_loads(f.read())
                     self.api_key = creds.get('api_key')
                     self.access_token = creds.get('access_token')
+                    self.login_time = creds.get('login_time')
+                    self.profile_checked_at = creds.get('profile_checked_at')
+                    self.user_name = creds.get('user_name')
+                    self.saved_credentials = creds
         except Exception as e:
             print(f"Error loading credentials: {e}")
     
+    def session_expired(self):
+        """True when the saved access token predates the last 6 AM daily token reset"""
+        if not self.login_time:
+            return False
+        now = datetime.now()
+        reset = now.replace(hour=6, minute=0, second=0, microsecond=0)
+        if now < reset:
+            reset -= timedelta(days=1)
+        return datetime.fromtimestamp(self.login_time) < reset
+    
+    def profile_recently_checked(self):
+        """True when profile() accepted the saved token within PROFILE_CHECK_TTL seconds"""
+        if not self.profile_checked_at or not self.user_name:
+            return False
+        return time.time() - self.profile_checked_at < PROFILE_CHECK_TTL
+    
     def save_credentials(self):
         """Save API credentials to file"""
         try:
             creds = {
                 'api_key': self.api_key,
-                'access_token': self.access_token
+                'access_token': self.access_token,
+                'login_time': self.login_time,
+                'profile_checked_at': self.profile_checked_at,
+                'user_name': self.user_name
             }
-            with open('zerodha_credentials.json', 'w') as f:
+            if creds == self.saved_credentials:
+                return
+            # Write a temp file and swap it in so a crash mid-write never leaves a truncated token file
+            with open('zerodha_credentials.json.tmp', 'w') as f:
                 json.dump(creds, f)
+                # The rename is only crash-safe once the new contents are on disk
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace('zerodha_credentials.json.tmp', 'zerodha_credentials.json')
+            self.saved_credentials = creds
         except Exception as e:
             print(f"Error saving credentials: {e}")
     
+    def _fetch_instruments(self, exchange):
+        """Today's parsed instrument dump for exchange, read from the local cache when present"""
+        today = datetime.now().date()
+        cache_file = os.path.join(INSTRUMENT_CACHE_DIR, f"instruments_{exchange}_{today}.pkl")
+        if os.path.exists(cache_file):
+            try:
+                return pd.read_pickle(cache_file)
+            except Exception as e:
+                self.log_message(f"Ignoring unreadable instrument cache {cache_file}: {e}")
+        df = self._download_instruments(exchange)
+        if 'expiry' in df.columns:
+            # Parse expiry once at load; month filters reuse the precomputed label
+            expiry_dt = pd.to_datetime(df['expiry'], errors='coerce')
+            df['expiry'] = expiry_dt.dt.date
+            df['expiry_month'] = expiry_dt.dt.strftime('%b %Y').astype('category')
+        # A handful of distinct values repeated over every row: categoricals keep the
+        # frame and its pickle a fraction of the size and turn equality filters into code compares
+        if 'instrument_type' in df.columns:
+            df['instrument_type'] = df['instrument_type'].astype('category')
+        try:
+            os.makedirs(INSTRUMENT_CACHE_DIR, exist_ok=True)
+            # Drop earlier days' dumps for this exchange before writing today's
+            for name in os.listdir(INSTRUMENT_CACHE_DIR):
+                if name.startswith(f"instruments_{exchange}_"):
+                    os.remove(os.path.join(INSTRUMENT_CACHE_DIR, name))
+            df.to_pickle(cache_file)
+        except Exception as e:
+            self.log_message(f"Could not write instrument cache {cache_file}: {e}")
+        return df
+    
+    def _download_instruments(self, exchange):
+        """Instrument dump for exchange parsed straight from Kite's CSV by pandas"""
+        # kiteconnect builds one dict per row and converts every field in Python;
+        # read_csv parses only the columns we use, in C
+        response = self.kite.reqsession.get(
+            self.kite.root + self.kite._routes["market.instruments"].format(exchange=exchange),
+            headers=self._kite_headers(), timeout=self.kite.timeout)
+        if response.status_code != 200:
+            return pd.DataFrame(self.kite.instruments(exchange))
+        return pd.read_csv(io.BytesIO(response.content), usecols=INSTRUMENT_COLUMNS,
+                           dtype={'tradingsymbol': str, 'name': str, 'instrument_type': str},
+                           keep_default_na=False)
+    
     def load_instruments(self):
         """Load MCX instruments"""
         try:
             if self.kite and self.is_logged_in:
-                all_instruments = self.kite.instruments("MCX")
-                self.instruments_df = pd.DataFrame(all_instruments)
-                if 'expiry' in self.instruments_df.columns and self.instruments_df['expiry'].dtype == 'object':
-                    self.instruments_df['expiry'] = pd.to_datetime(self.instruments_df['expiry']).dt.date
-                print(f"Loaded {len(self.instruments_df)} MCX instruments")
-                self.log_message(f"Loaded {len(self.instruments_df)} MCX instruments")
+                # A re-login on the same day keeps the dump and indexes already in memory
+                if self.instruments_loaded_on.get("MCX") == datetime.now().date():
+                    return
+                # Build the frame and its indexes in locals; table refreshes on other threads only
+                # ever see a finished frame
+                df = self._fetch_instruments("MCX")
+                df['kind'] = df['instrument_type'].map(INSTRUMENT_KINDS)
+                # Cache tradingsymbol -> token once so ticker subscriptions skip the df scan
+                symbol_tokens = dict(zip(df['tradingsymbol'], df['instrument_token'].astype(int).tolist()))
+                # 3-char tradingsymbol prefix -> row positions, so prefix filters only scan candidates
+                prefix_index = df.groupby(df['tradingsymbol'].str[:3]).indices
+                # Underlying name -> row positions for the per-underlying option lookups
+                name_index = df.groupby('name').indices
+                self.symbol_tokens['MCX'] = symbol_tokens
+                self.symbol_prefix_index['MCX'] = (df, prefix_index)
+                self.name_index['MCX'] = (df, name_index)
+                self.instruments_df = df
+                print(f"Loaded {len(df)} MCX instruments")
+                self.log_message(f"Loaded {len(df)} MCX instruments")
+                self.instruments_loaded_on["MCX"] = datetime.now().date()
         except Exception as e:
             self.log_message(f"Error loading MCX instruments: {e}")
     
@@ -121,15 +398,51 @@ class ZerodhaTradingApp:
         """Load NFO instruments (includes indices and stocks)"""
         try:
             if self.kite and self.is_logged_in:
-                all_instruments = self.kite.instruments("NFO")
-                self.nfo_instruments_df = pd.DataFrame(all_instruments)
-                if 'expiry' in self.nfo_instruments_df.columns and self.nfo_instruments_df['expiry'].dtype == 'object':
-                    self.nfo_instruments_df['expiry'] = pd.to_datetime(self.nfo_instruments_df['expiry']).dt.date
-                print(f"Loaded {len(self.nfo_instruments_df)} NFO instruments")
-                self.log_message(f"Loaded {len(self.nfo_instruments_df)} NFO instruments")
+                # A re-login on the same day keeps the dump and indexes already in memory
+                if self.instruments_loaded_on.get("NFO") == datetime.now().date():
+                    return
+                # Build the frame and its indexes in locals; table refreshes on other threads only
+                # ever see a finished frame
+                df = self._fetch_instruments("NFO")
+                df['kind'] = df['instrument_type'].map(INSTRUMENT_KINDS)
+                # Cache tradingsymbol -> token once so ticker subscriptions skip the df scan
+                symbol_tokens = dict(zip(df['tradingsymbol'], df['instrument_token'].astype(int).tolist()))
+                # 3-char tradingsymbol prefix -> row positions, so prefix filters only scan candidates
+                prefix_index = df.groupby(df['tradingsymbol'].str[:3]).indices
+                # Underlying name -> row positions for the per-underlying option lookups
+                name_index = df.groupby('name').indices
+                self.symbol_tokens['NFO'] = symbol_tokens
+                self.symbol_prefix_index['NFO'] = (df, prefix_index)
+                self.name_index['NFO'] = (df, name_index)
+                self.nfo_instruments_df = df
+                print(f"Loaded {len(df)} NFO instruments")
+                self.log_message(f"Loaded {len(df)} NFO instruments")
+                self.instruments_loaded_on["NFO"] = datetime.now().date()
         except Exception as e:
             self.log_message(f"Error loading NFO instruments: {e}")
     
+    def load_all_instruments(self):
+        """Fetch the MCX and NFO instrument dumps concurrently"""
+        futures = [self.io_executor.submit(self.load_instruments),
+                   self.io_executor.submit(self.load_nfo_instruments)]
+        for future in futures:
+            future.result()
+    
+    def _rows_with_prefix(self, df, exchange, prefix):
+        """Rows of df whose tradingsymbol starts with prefix, narrowed first through the prefix index"""
+        owner, index = self.symbol_prefix_index.get(exchange, (None, None))
+        if owner is df and len(prefix) >= 3:
+            df = df.iloc[index.get(prefix[:3], [])]
+        return df[df['tradingsymbol'].str.startswith(prefix, na=False)]
+    
+    def _rows_with_name(self, df, exchange, name):
+        """Rows of df for one underlying name, taken straight from the name index built for df"""
+        owner, index = self.name_index.get(exchange, (None, None))
+        # A frame replaced by a day-change reload mid-lookup falls back to the scan, never a stale index
+        if owner is df:
+            return df.iloc[index.get(name, [])]
+        return df[df['name'] == name]
+    
     def get_all_futures(self):
         """Get all available MCX futures contracts"""
         try:
@@ -137,10 +450,7 @@ class ZerodhaTradingApp:
                 self.load_instruments()
                 if self.instruments_df is None:
                     return []
-            futures_df = self.instruments_df[
-                (self.instruments_df['instrument_type'] == 'FUT') |
-                (self.instruments_df['name'].str.contains('FUT', na=False))
-            ].copy()
+            futures_df = self.instruments_df[self.instruments_df['kind'] == 'FUT'].copy()
             futures_df = futures_df.sort_values(['name', 'expiry'])
             current_date = datetime.now().date()
             futures_df = futures_df[futures_df['expiry'] >= current_date]
@@ -156,20 +466,13 @@ class ZerodhaTradingApp:
                 self.load_instruments()
                 if self.instruments_df is None:
                     return []
-            options_df = self.instruments_df[
-                (self.instruments_df['instrument_type'] == 'CE') |
-                (self.instruments_df['instrument_type'] == 'PE') |
-                (self.instruments_df['name'].str.contains('CE', na=False)) |
-                (self.instruments_df['name'].str.contains('PE', na=False))
-            ].copy()
+            df = self.instruments_df
             if base_symbol:
-                options_df = options_df[
-                    options_df['tradingsymbol'].str.startswith(base_symbol)
-                ]
+                df = self._rows_with_prefix(df, "MCX", base_symbol)
+            options_df = df[df['kind'] == 'OPT'].copy()
             # Filter by expiry month if provided
             if expiry_month:
-                options_df['expiry_dt'] = pd.to_datetime(options_df['expiry'])
-                options_df = options_df[options_df['expiry_dt'].dt.strftime('%b %Y') == expiry_month]
+                options_df = options_df[options_df['expiry_month'] == expiry_month]
             options_df = options_df.sort_values(['name', 'expiry', 'strike'])
             current_date = datetime.now().date()
             options_df = options_df[options_df['expiry'] >= current_date]
@@ -191,17 +494,12 @@ class ZerodhaTradingApp:
                 self.load_nfo_instruments()
                 if self.nfo_instruments_df is None:
                     return []
-            options_df = self.nfo_instruments_df[
-                (self.nfo_instruments_df['instrument_type'] == 'CE') |
-                (self.nfo_instruments_df['instrument_type'] == 'PE')
-            ].copy()
+            df = self.nfo_instruments_df
             if base_symbol:
-                options_df = options_df[
-                    options_df['tradingsymbol'].str.startswith(base_symbol)
-                ]
+                df = self._rows_with_prefix(df, "NFO", base_symbol)
+            options_df = df[df['kind'] == 'OPT'].copy()
             if expiry_month:
-                options_df['expiry_dt'] = pd.to_datetime(options_df['expiry'])
-                options_df = options_df[options_df['expiry_dt'].dt.strftime('%b %Y') == expiry_month]
+                options_df = options_df[options_df['expiry_month'] == expiry_month]
             options_df = options_df.sort_values(['name', 'expiry', 'strike'])
             current_date = datetime.now().date()
             options_df = options_df[options_df['expiry'] >= current_date]
@@ -222,14 +520,10 @@ class ZerodhaTradingApp:
                 self.load_nfo_instruments()
                 if self.nfo_instruments_df is None:
                     return []
-            options_df = self.nfo_instruments_df[
-                ((self.nfo_instruments_df['instrument_type'] == 'CE') |
-                 (self.nfo_instruments_df['instrument_type'] == 'PE')) &
-                (self.nfo_instruments_df['name'] == stock_symbol)
-            ].copy()
+            df = self._rows_with_name(self.nfo_instruments_df, "NFO", stock_symbol)
+            options_df = df[df['kind'] == 'OPT'].copy()
             if expiry_month:
-                options_df['expiry_dt'] = pd.to_datetime(options_df['expiry'])
-                options_df = options_df[options_df['expiry_dt'].dt.strftime('%b %Y') == expiry_month]
+                options_df = options_df[options_df['expiry_month'] == expiry_month]
             options_df = options_df.sort_values(['name', 'expiry', 'strike'])
             current_date = datetime.now().date()
             options_df = options_df[options_df['expiry'] >= current_date]
@@ -246,15 +540,10 @@ class ZerodhaTradingApp:
     def get_underlying_ltp(self, symbol, exchange):
         """Fetch current LTP for underlying symbol (index or stock)"""
         try:
-            if exchange in ("NFO", "NSE"):
-                underlying_exchange = "NSE"
-                underlying_symbol = symbol
-            elif exchange == "MCX":
-                underlying_exchange = "MCX"
-                underlying_symbol = symbol
-            else:
+            underlying_exchange = UNDERLYING_EXCHANGES.get(exchange)
+            if underlying_exchange is None:
                 return None
-            ltp_data = self.kite.ltp(f"{underlying_exchange}:{underlying_symbol}")
+            ltp_data = self.fast_ltp(f"{underlying_exchange}:{symbol}")
             return list(ltp_data.values())[0]['last_price']
         except Exception as e:
             self.log_message(f"Error fetching underlying LTP for {symbol}: {e}")
@@ -272,22 +561,22 @@ class ZerodhaTradingApp:
     def get_unique_expiry_months(self, exchange, underlying=None):
         """Return sorted list of unique expiry months (as strings) for given exchange/underlying."""
         try:
-            if exchange == "MCX":
-                df = self.instruments_df
-            elif exchange in ("NFO", "NSE"):
-                df = self.nfo_instruments_df
-            else:
+            index_exchange = DUMP_EXCHANGES.get(exchange)
+            if index_exchange is None:
                 return []
+            df = self.instruments_df if index_exchange == "MCX" else self.nfo_instruments_df
             if df is None:
                 return []
-            # Filter options only
-            opts = df[df['instrument_type'].isin(['CE', 'PE'])].copy()
             if underlying:
-                opts = opts[opts['tradingsymbol'].str.startswith(underlying) | (opts['name'] == underlying)]
+                # Union of the symbol-prefix and underlying-name matches, both served from the indexes
+                prefixed = self._rows_with_prefix(df, index_exchange, underlying)
+                named = self._rows_with_name(df, index_exchange, underlying)
+                df = df.loc[prefixed.index.union(named.index)]
+            # Filter options only
+            opts = df[df['kind'] == 'OPT']
             if opts.empty:
                 return []
-            opts['expiry'] = pd.to_datetime(opts['expiry'])
-            months = opts['expiry'].dt.strftime('%b %Y').unique()
+            months = opts['expiry_month'].dropna().unique()
             months = sorted(months, key=lambda x: datetime.strptime(x, '%b %Y'))
             return months
         except Exception as e:
@@ -312,16 +601,12 @@ class ZerodhaTradingApp:
                 self.load_instruments()
                 if self.instruments_df is None:
                     return []
-            relevant_instruments = self.instruments_df[
-                (self.instruments_df['tradingsymbol'].str.startswith(base_symbol)) &
-                (self.instruments_df['tradingsymbol'].str.contains('FUT')) &
-                (self.instruments_df['expiry'].notnull())
-            ].copy()
+            # The prefix index narrows the rows before any string scan runs
+            base_matches = self._rows_with_prefix(self.instruments_df, "MCX", base_symbol)
+            base_matches = base_matches[base_matches['expiry'].notnull()]
+            relevant_instruments = base_matches[base_matches['kind'] == 'FUT'].copy()
             if relevant_instruments.empty:
-                relevant_instruments = self.instruments_df[
-                    (self.instruments_df['tradingsymbol'].str.startswith(base_symbol)) &
-                    (self.instruments_df['expiry'].notnull())
-                ].copy()
+                relevant_instruments = base_matches.copy()
             if relevant_instruments.empty:
                 self.log_message(f"No contracts found for {base_symbol}")
                 return []
@@ -367,6 +652,8 @@ class ZerodhaTradingApp:
         """Setup the main GUI interface"""
         notebook = ttk.Notebook(self.root)
         notebook.pack(fill='both', expand=True, padx=10, pady=10)
+        # Live-table loops read the cached tab path instead of querying Tk from their threads
+        notebook.bind('<<NotebookTabChanged>>', lambda e: setattr(self, 'visible_tab', notebook.select()))
         
         self.setup_login_tab(notebook)
         self.setup_market_data_tab(notebook)
@@ -376,6 +663,8 @@ class ZerodhaTradingApp:
         self.setup_nse_options_trading_tab(notebook)      # NSE Stock Options
         self.setup_positions_tab(notebook)
         self.setup_pnl_tab(notebook)
+        # <<NotebookTabChanged>> only fires on a switch, so seed the cache with the opening tab
+        self.visible_tab = notebook.select()
     
     # ---------- Login Tab ----------
     def setup_login_tab(self, notebook):
@@ -403,13 +692,19 @@ class ZerodhaTradingApp:
         self.login_status = ttk.Label(login_frame, text="Not Logged In", foreground='red')
         self.login_status.grid(row=4, column=0, columnspan=3, padx=10, pady=10)
     
+    def _kite_client(self):
+        """The current KiteConnect when it was built for this API key, so its pooled connections survive a re-login"""
+        if self.kite is not None and self.kite.api_key == self.api_key:
+            return self.kite
+        return KiteConnect(api_key=self.api_key, pool=KITE_HTTP_POOL)
+    
     def generate_login_url(self):
         try:
             self.api_key = self.api_key_entry.get()
             if not self.api_key:
                 messagebox.showerror("Error", "Please enter API Key")
                 return
-            self.kite = KiteConnect(api_key=self.api_key)
+            self.kite = self._kite_client()
             login_url = self.kite.login_url()
             webbrowser.open(login_url)
             messagebox.showinfo("Login URL", f"Login URL generated and opened in browser.\nIf not, copy this URL:\n{login_url}")
@@ -417,43 +712,96 @@ class ZerodhaTradingApp:
             messagebox.showerror("Error", f"Failed to generate login URL: {e}")
     
     def manual_login(self):
+        self.api_key = self.api_key_entry.get()
+        api_secret = self.api_secret_entry.get()
+        request_token = self.request_token_entry.get()
+        if not all([self.api_key, api_secret, request_token]):
+            messagebox.showerror("Error", "Please fill all fields")
+            return
+        self.login_status.config(text="Logging in...", foreground='orange')
+        # Session exchange and instrument dumps are network-bound; keep them off the Tk thread
+        threading.Thread(target=self._manual_login_worker, args=(request_token, api_secret), daemon=True).start()
+    
+    def _manual_login_worker(self, request_token, api_secret):
         try:
-            self.api_key = self.api_key_entry.get()
-            api_secret = self.api_secret_entry.get()
-            request_token = self.request_token_entry.get()
-            if not all([self.api_key, api_secret, request_token]):
-                messagebox.showerror("Error", "Please fill all fields")
-                return
-            self.kite = KiteConnect(api_key=self.api_key)
+            self.kite = self._kite_client()
+            # The session exchange must not carry a previous day's token
+            self.kite.set_access_token(None)
             data = self.kite.generate_session(request_token, api_secret=api_secret)
             self.access_token = data['access_token']
+            self.login_time = time.time()
+            # generate_session returns the profile fields too, so the token counts as checked
+            self.profile_checked_at = self.login_time
+            self.user_name = data.get('user_name')
             self.kite.set_access_token(self.access_token)
             self.save_credentials()
             self.is_logged_in = True
-            self.login_status.config(text="Logged In Successfully", foreground='green')
-            self.load_instruments()
-            self.load_nfo_instruments()
-            self.start_background_tasks()
-            messagebox.showinfo("Success", "Login successful!")
+            self.load_all_instruments()
         except Exception as e:
-            messagebox.showerror("Error", f"Login failed: {e}")
+            self.root.after(0, lambda err=e: self._on_login_failed(f"Login failed: {err}"))
+            return
+        self.root.after(0, lambda: self._on_login_success("Logged In Successfully", "Login successful!"))
     
     def auto_login(self):
+        if not hasattr(self, 'api_key') or not hasattr(self, 'access_token'):
+            messagebox.showerror("Error", "No saved credentials found")
+            return
+        # Kite tokens reset daily; skip the profile() round trip that is bound to fail
+        if self.session_expired():
+            self.login_status.config(text="Session expired - please login again", foreground='red')
+            return
+        self.login_status.config(text="Logging in...", foreground='orange')
+        threading.Thread(target=self._auto_login_worker, daemon=True).start()
+    
+    def _auto_login_worker(self):
         try:
-            if not hasattr(self, 'api_key') or not hasattr(self, 'access_token'):
-                messagebox.showerror("Error", "No saved credentials found")
-                return
-            self.kite = KiteConnect(api_key=self.api_key)
+            self.kite = self._kite_client()
             self.kite.set_access_token(self.access_token)
-            profile = self.kite.profile()
+            # A recent profile() check is trusted; a rejected token surfaces later as TokenException
+            if not self.profile_recently_checked():
+                profile = self.kite.profile()
+                self.profile_checked_at = time.time()
+                self.user_name = profile['user_name']
+                self.save_credentials()
             self.is_logged_in = True
-            self.login_status.config(text=f"Auto Login Successful - {profile['user_name']}", foreground='green')
-            self.load_instruments()
-            self.load_nfo_instruments()
-            self.start_background_tasks()
-            messagebox.showinfo("Success", f"Auto login successful! Welcome {profile['user_name']}")
+            self.load_all_instruments()
         except Exception as e:
-            messagebox.showerror("Error", f"Auto login failed: {e}")
+            self.root.after(0, lambda err=e: self._on_login_failed(f"Auto login failed: {err}"))
+            return
+        user_name = self.user_name
+        self.root.after(0, lambda: self._on_login_success(f"Auto Login Successful - {user_name}",
+                                                          f"Auto login successful! Welcome {user_name}"))
+    
+    def _on_login_success(self, status, message):
+        """Finish a login on the Tk thread once the worker has a session and instruments"""
+        self.login_status.config(text=status, foreground='green')
+        self.start_background_tasks()
+        messagebox.showinfo("Success", message)
+    
+    def show_toast(self, message, duration=4000):
+        """Non-modal notice along the bottom of the window for successes; errors keep their dialogs"""
+        if self.toast_job:
+            self.root.after_cancel(self.toast_job)
+        if self.toast_label is None:
+            self.toast_label = tk.Label(self.root, bg='#2e7d32', fg='white', padx=12, pady=6)
+        self.toast_label.config(text=message)
+        self.toast_label.place(relx=0.5, rely=1.0, anchor='s', y=-15)
+        self.toast_label.lift()
+        self.toast_job = self.root.after(duration, self.toast_label.place_forget)
+    
+    def invalidate_session(self, error):
+        """Drop a session Zerodha has rejected so the background loops stop and login is required"""
+        self.is_logged_in = False
+        self.profile_checked_at = None
+        self.save_credentials()
+        self._close_ticker()
+        self.log_message(f"Session rejected by Zerodha: {error}")
+        self.root.after(0, lambda: self.login_status.config(text="Session expired - please login again",
+                                                            foreground='red'))
+    
+    def _on_login_failed(self, message):
+        self.login_status.config(text="Not Logged In", foreground='red')
+        messagebox.showerror("Error", message)
     
     # ---------- Market Data Tab ----------
     def setup_market_data_tab(self, notebook):
@@ -488,9 +836,8 @@ class ZerodhaTradingApp:
         if not self.is_logged_in:
             messagebox.showerror("Error", "Please login first")
             return
-        try:
-            base_instrument = self.instrument_var.get()
-            contracts = self.get_monthly_contracts(base_instrument)
+        base_instrument = self.instrument_var.get()
+        def apply(contracts):
             self.contracts_listbox.delete(0, tk.END)
             for contract in contracts:
                 self.contracts_listbox.insert(tk.END, contract)
@@ -500,8 +847,10 @@ class ZerodhaTradingApp:
                 self.log_message(f"Loaded {len(contracts)} contracts for {base_instrument}")
             else:
                 self.log_message(f"No contracts found for {base_instrument}")
-        except Exception as e:
-            self.log_message(f"Error loading contracts: {e}")
+        # get_monthly_contracts downloads the MCX dump when it is not loaded yet
+        self.log_message(f"Loading contracts for {base_instrument}...")
+        self._run_in_background(lambda: self.get_monthly_contracts(base_instrument), apply, self.log_message,
+                                "Error loading contracts")
     
     def start_live_data(self):
         if not self.is_logged_in:
@@ -517,26 +866,29 @@ class ZerodhaTradingApp:
     
     def fetch_live_data(self, contracts):
         try:
+            backoff = 5
+            instruments = [f"MCX:{contract}" for contract in contracts]
             while self.live_data_running and self.is_logged_in:
                 try:
-                    instruments = [f"MCX:{contract}" for contract in contracts]
                     ltp_data = self.kite.ltp(instruments)
+                    # Every row of one poll shares a single wall-clock stamp
+                    timestamp = datetime.now().strftime("%H:%M:%S")
                     data = []
                     for key, values in ltp_data.items():
-                        contract_name = key.replace("MCX:", "")
                         data.append({
-                            'Contract': contract_name,
+                            'Contract': key.split(":", 1)[1],
                             'LTP': values['last_price'],
                             'Volume': values.get('volume', 0),
                             'Change': values.get('net_change', 0),
                             'OI': values.get('oi', 0),
-                            'Timestamp': datetime.now().strftime("%H:%M:%S")
+                            'Timestamp': timestamp
                         })
                     self.update_market_data_display(data)
+                    backoff = 5
                     time.sleep(2)
                 except Exception as e:
                     self.log_message(f"Error in live data fetch: {e}")
-                    time.sleep(5)
+                    backoff = _backoff_sleep(backoff)
         except Exception as e:
             self.log_message(f"Live data stream stopped: {e}")
     
@@ -603,6 +955,7 @@ class ZerodhaTradingApp:
         self.futures_tree.column('Change', width=80, anchor='center')
         self.futures_tree.column('Volume', width=80, anchor='center')
         self.futures_tree.pack(fill='both', expand=True)
+        self._configure_change_tags(self.futures_tree)
         
         # Order placement (right side)
         order_frame = ttk.LabelFrame(right_frame, text="Futures Order Placement")
@@ -773,7 +1126,8 @@ class ZerodhaTradingApp:
         self.options_month_var = tk.StringVar()
         self.options_month_combo = ttk.Combobox(options_controls_frame, textvariable=self.options_month_var, width=12)
         self.options_month_combo.pack(side='left', padx=5)
-        self.options_month_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_options_table())
+        self.options_month_combo.bind('<<ComboboxSelected>>',
+                                      lambda e: self.schedule_table_refresh(self.refresh_options_table))
         
         ttk.Button(options_controls_frame, text="Refresh Options", command=self.refresh_options_table).pack(side='left', padx=5)
         ttk.Button(options_controls_frame, text="Start Live Prices", command=self.start_options_live_data).pack(side='left', padx=5)
@@ -790,6 +1144,7 @@ class ZerodhaTradingApp:
         tree_scroll.config(command=self.options_tree.yview)
         # ... (headings and columns unchanged)
         self.options_tree.pack(fill='both', expand=True)
+        self._configure_change_tags(self.options_tree)
         
         # Right side: order placement (unchanged)
         order_frame = ttk.LabelFrame(right_frame, text="MCX Options Order Placement")
@@ -1061,7 +1416,8 @@ class ZerodhaTradingApp:
         self.nfo_options_month_var = tk.StringVar()
         self.nfo_options_month_combo = ttk.Combobox(options_controls_frame, textvariable=self.nfo_options_month_var, width=12)
         self.nfo_options_month_combo.pack(side='left', padx=5)
-        self.nfo_options_month_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_nfo_options_table())
+        self.nfo_options_month_combo.bind('<<ComboboxSelected>>',
+                                      lambda e: self.schedule_table_refresh(self.refresh_nfo_options_table))
         
         ttk.Button(options_controls_frame, text="Refresh NFO Options", command=self.refresh_nfo_options_table).pack(side='left', padx=5)
         ttk.Button(options_controls_frame, text="Start Live Prices", command=self.start_nfo_options_live_data).pack(side='left', padx=5)
@@ -1078,6 +1434,7 @@ class ZerodhaTradingApp:
         tree_scroll.config(command=self.nfo_options_tree.yview)
         # ... (headings and columns)
         self.nfo_options_tree.pack(fill='both', expand=True)
+        self._configure_change_tags(self.nfo_options_tree)
         
         # Right side: order placement (unchanged)
         order_frame = ttk.LabelFrame(right_frame, text="NFO Index Options Order Placement")
@@ -1318,7 +1675,8 @@ class ZerodhaTradingApp:
         self.nse_options_month_var = tk.StringVar()
         self.nse_options_month_combo = ttk.Combobox(options_controls_frame, textvariable=self.nse_options_month_var, width=12)
         self.nse_options_month_combo.pack(side='left', padx=5)
-        self.nse_options_month_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_nse_options_table())
+        self.nse_options_month_combo.bind('<<ComboboxSelected>>',
+                                      lambda e: self.schedule_table_refresh(self.refresh_nse_options_table))
         
         ttk.Button(options_controls_frame, text="Refresh NSE Options", command=self.refresh_nse_options_table).pack(side='left', padx=5)
         ttk.Button(options_controls_frame, text="Start Live Prices", command=self.start_nse_options_live_data).pack(side='left', padx=5)
@@ -1335,6 +1693,7 @@ class ZerodhaTradingApp:
         tree_scroll.config(command=self.nse_options_tree.yview)
         # ... (headings and columns)
         self.nse_options_tree.pack(fill='both', expand=True)
+        self._configure_change_tags(self.nse_options_tree)
         
         # Right side: order placement (unchanged)
         order_frame = ttk.LabelFrame(right_frame, text="NSE Stock Options Order Placement")
@@ -2304,43 +2663,329 @@ class ZerodhaTradingApp:
         messagebox.showinfo("Selection Valid", f"{len(self.selected_nse_single_options)} NSE options contracts selected and ready for trading")
     
     # ---------- Real-time Price Methods ----------
+    def _claim_order_batch(self, name):
+        """Mark an order batch as running; False when another batch still holds the slot"""
+        # Single state value: None means idle, otherwise the name of the running executor
+        with self.order_batch_lock:
+            if self.active_order_batch is not None:
+                return False
+            self.active_order_batch = name
+            return True
+    
+    def _release_order_batch(self):
+        with self.order_batch_lock:
+            self.active_order_batch = None
+    
+    def _start_order_batch(self, target, args):
+        """Run an order executor on a worker thread unless another batch is still being placed"""
+        if not self._claim_order_batch(target.__name__):
+            messagebox.showwarning("Warning", "Previous orders are still being placed, please wait")
+            return False
+        def run():
+            try:
+                target(*args)
+            finally:
+                self._release_order_batch()
+        Thread(target=run, daemon=True).start()
+        return True
+    
+    def _set_price_label(self, label, symbol, color):
+        """Show symbol's latest LTP on label, skipping the Tk call when it has not ticked since the last render"""
+        price = self.current_prices.get(symbol)
+        if getattr(label, 'shown_price', -1) == price:
+            return
+        label.shown_price = price
+        if price:
+            label.config(text=f"₹{price:.2f}", foreground=color)
+        else:
+            label.config(text="Price unavailable", foreground='red')
+    
+    def _read_limit_price(self, entry):
+        """Return the positive price typed into entry, or 0 if blank/non-positive"""
+        text = entry.get()
+        price = float(text) if text else 0
+        return price if price > 0 else 0
+    
+    def _cache_prices(self, prices):
+        """Store LTPs in current_prices and stamp them for the quote TTL"""
+        now = time.monotonic()
+        self.current_prices.update(prices)
+        for symbol in prices:
+            self.price_timestamps[symbol] = now
+    
+    def _order_params(self, exchange, symbol, transaction, quantity, order_type="MARKET", price=None):
+        """place_order kwargs built on ORDER_DEFAULTS; price is only sent with LIMIT orders"""
+        params = dict(ORDER_DEFAULTS, exchange=exchange, tradingsymbol=symbol, transaction_type=transaction,
+                      quantity=quantity, order_type=ORDER_TYPES[order_type])
+        if order_type == "LIMIT":
+            params['price'] = price
+        return params
+    
+    def _kite_headers(self):
+        """Auth headers kiteconnect sends, for the calls made directly on its session"""
+        return {'X-Kite-Version': self.kite.kite_header_version,
+                'Authorization': f"token {self.kite.api_key}:{self.kite.access_token}"}
+    
+    def fast_ltp(self, instruments):
+        """kite.ltp over the pooled session, skipping kiteconnect's generic request wrapper"""
+        if isinstance(instruments, str):
+            instruments = [instruments]
+        response = self.kite.reqsession.get(
+            self.kite.root + self.kite._routes["market.quote.ltp"],
+            params=[('i', instrument) for instrument in instruments],
+            headers=self._kite_headers(),
+            timeout=self.kite.timeout)
+        if response.status_code != 200:
+            # Raise kiteconnect's typed exception from this response rather than repeating the
+            # request through kite.ltp, which would double the load during an outage or rate limit
+            try:
+                error = json_loads(response.content)
+            except ValueError:
+                raise kite_exceptions.DataException(
+                    f"Couldn't parse the JSON response received from the server: {response.content!r}",
+                    code=response.status_code)
+            exception = getattr(kite_exceptions, str(error.get('error_type')), kite_exceptions.GeneralException)
+            raise exception(error.get('message', f"HTTP {response.status_code}"), code=response.status_code)
+        return json_loads(response.content)['data']
+    
     def get_current_price(self, symbol, exchange="MCX"):
+        # Serve repeated reads within QUOTE_TTL from memory instead of another REST call
+        stamp = self.price_timestamps.get(symbol)
+        if stamp is not None and time.monotonic() - stamp < QUOTE_TTL:
+            return self.current_prices[symbol]
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                ltp_data = self.kite.ltp(f"{exchange}:{symbol}")
+                ltp_data = self.fast_ltp(f"{exchange}:{symbol}")
                 price = list(ltp_data.values())[0]['last_price']
-                self.current_prices[symbol] = price
+                self._cache_prices({symbol: price})
                 return price
             except Exception as e:
                 self.log_message(f"Price fetch attempt {attempt + 1} failed for {symbol}: {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(1)
+                    # Exponential backoff (0.5s, 1s) to ride out transient 502/503s
+                    time.sleep(0.5 * 2 ** attempt)
         return None
     
+    def get_current_prices(self, symbols, exchange="MCX"):
+        """Fetch LTPs for several symbols with a single kite.ltp call"""
+        if not symbols:
+            return {}
+        try:
+            ltp_data = self.fast_ltp([f"{exchange}:{symbol}" for symbol in symbols])
+        except Exception as e:
+            self.log_message(f"Batched price fetch failed for {len(symbols)} symbols: {e}")
+            return {}
+        prices = {}
+        for instrument_key, data in ltp_data.items():
+            symbol = instrument_key.split(":", 1)[1]
+            prices[symbol] = data['last_price']
+        self._cache_prices(prices)
+        return prices
+    
     def start_price_updates_for_order(self, symbols, exchange="MCX"):
         self.price_update_event.clear()
+        token_symbols = self.get_instrument_tokens(symbols, exchange)
+        # Tokens of an earlier window that never reached stop_price_updates stop streaming here,
+        # so token_to_symbol stays the live subscription set
+        self._release_order_price_tokens(keep=token_symbols)
+        if self.ticker_connected and len(token_symbols) == len(symbols):
+            # Prices are pushed into current_prices by on_ticks, no REST polling needed
+            tokens = list(token_symbols)
+            # Tokens still streaming from an earlier batch need no new subscribe frames
+            new_tokens = [token for token in tokens if token not in self.token_to_symbol]
+            self.token_to_symbol.update(token_symbols)
+            self.order_price_tokens = tokens
+            self._subscribe_ltp(self.kws, new_tokens)
+            return
         Thread(target=self._update_prices_continuously, args=(symbols, exchange), daemon=True).start()
     
     def stop_price_updates(self):
         self.price_update_event.set()
+        self._release_order_price_tokens()
+    
+    def _release_order_price_tokens(self, keep=()):
+        """Unsubscribe the order windows' tokens, except those in keep"""
+        stale = [token for token in self.order_price_tokens if token not in keep]
+        if stale and self.ticker_connected:
+            try:
+                self.kws.unsubscribe(stale)
+            except Exception as e:
+                self.log_message(f"Error unsubscribing order price tokens: {e}")
+        # token_to_symbol doubles as the subscribed-token set for on_ticks, so keep it to live tokens
+        for token in stale:
+            self.token_to_symbol.pop(token, None)
+        self.order_price_tokens = [token for token in self.order_price_tokens if token in keep]
+    
+    # ---------- WebSocket (KiteTicker) Methods ----------
+    def get_instrument_tokens(self, symbols, exchange="MCX"):
+        """Map instrument token -> tradingsymbol for the symbols found in the cached token map"""
+        symbol_tokens = self.symbol_tokens.get(exchange, {})
+        return {symbol_tokens[symbol]: symbol for symbol in symbols if symbol in symbol_tokens}
+    
+    def _subscribe_ltp(self, ws, tokens):
+        """Subscribe tokens in LTP mode with one subscribe/set_mode pair per TICKER_BATCH tokens"""
+        for i in range(0, len(tokens), TICKER_BATCH):
+            batch = tokens[i:i + TICKER_BATCH]
+            ws.subscribe(batch)
+            ws.set_mode(ws.MODE_LTP, batch)
+    
+    def start_ticker(self):
+        """Open the KiteTicker WebSocket used for streaming LTPs"""
+        try:
+            # A re-login replaces the ticker; the old socket must not keep streaming or reconnecting
+            self._close_ticker()
+            self.kws = FastKiteTicker(self.api_key, self.access_token)
+            self.kws.on_ticks = self.on_ticks
+            self.kws.on_connect = self.on_ticker_connect
+            self.kws.on_close = self.on_ticker_close
+            self.kws.on_error = self.on_ticker_error
+            self.kws.on_order_update = self.on_order_update
+            self.kws.connect(threaded=True)
+        except Exception as e:
+            self.log_message(f"Error starting ticker: {e}")
+    
+    def _close_ticker(self):
+        """Detach the current KiteTicker and close its socket on a daemon thread"""
+        kws = self.kws
+        self.kws = None
+        self.ticker_connected = False
+        if kws is not None:
+            # close() waits on the socket shutdown, so keep it off the caller's thread
+            threading.Thread(target=kws.close, daemon=True).start()
+    
+    def on_closing(self):
+        """Release the ticker, worker pool and pooled HTTP connections before the window goes"""
+        self._close_ticker()
+        self.io_executor.shutdown(wait=False)
+        if self.kite is not None:
+            try:
+                self.kite.reqsession.close()
+            except Exception as e:
+                print(f"Error closing Kite session: {e}")
+        self.root.destroy()
+    
+    def on_ticks(self, ws, ticks):
+        # Runs on the ticker's reactor thread: write straight into the price caches,
+        # which readers consume lock-free (single dict stores are atomic under the GIL)
+        now = time.monotonic()
+        token_to_symbol = self.token_to_symbol
+        current_prices = self.current_prices
+        price_timestamps = self.price_timestamps
+        # No try/except on this path: a tick without a token or price is skipped instead of
+        # raising into the ticker's reactor thread
+        for tick in ticks:
+            symbol = token_to_symbol.get(tick.get('instrument_token'))
+            if symbol:
+                price = tick.get('last_price')
+                if price is not None:
+                    current_prices[symbol] = price
+                    price_timestamps[symbol] = now
+    
+    def on_order_update(self, ws, data):
+        order_id = data.get('order_id')
+        if order_id:
+            with self.order_update_lock:
+                # Postbacks for orders nobody waits on (other terminals, later status changes)
+                # would otherwise pile up for the whole session
+                if order_id in self.order_updates:
+                    self.order_updates.move_to_end(order_id)
+                elif len(self.order_updates) >= ORDER_UPDATE_BACKLOG:
+                    self.order_updates.popitem(last=False)
+                self.order_updates[order_id] = data
+                watcher = self.watched_orders.pop(order_id, None) if data.get('status') in ORDER_SETTLED else None
+            if watcher:
+                self._report_order_update(order_id, watcher, data)
+            # Any status change can move positions, so the shared snapshot is stale from here
+            self.invalidate_positions()
+            if data.get('status') == 'COMPLETE':
+                self.request_positions_refresh()
+    
+    def watch_order(self, order_id, symbol, log_func):
+        """Report the order's rejection when its postback arrives, without holding up the batch"""
+        if not self.ticker_connected:
+            # No postback will come; look the status up once on the I/O pool instead
+            self.io_executor.submit(self._check_order_status, order_id, symbol, log_func)
+            return
+        expired = None
+        with self.order_update_lock:
+            update = self.order_updates.get(order_id)
+            # The postback can beat place_order's HTTP response back to us
+            if not update or update.get('status') not in ORDER_SETTLED:
+                # A postback that never arrives must not pin its entry for the whole session
+                if len(self.watched_orders) >= ORDER_UPDATE_BACKLOG:
+                    expired = self.watched_orders.popitem(last=False)
+                self.watched_orders[order_id] = (symbol, log_func)
+                update = None
+        if expired:
+            expired_id, (expired_symbol, expired_log) = expired
+            expired_log(f"⚠️ No postback for order {expired_id} ({expired_symbol}); its status is unknown")
+        if update:
+            self._report_order_update(order_id, (symbol, log_func), update)
+    
+    def _check_order_status(self, order_id, symbol, log_func):
+        """One order_history lookup for an order placed while the ticker is down"""
+        try:
+            history = self.kite.order_history(order_id)
+        except Exception as e:
+            log_func(f"⚠️ Status of order {order_id} for {symbol} unknown: {e}")
+            return
+        update = history[-1] if history else {}
+        if update.get('status') in ORDER_SETTLED:
+            self._report_order_update(order_id, (symbol, log_func), update)
+        else:
+            log_func(f"⚠️ Order {order_id} for {symbol} is {update.get('status', 'unknown')}; "
+                     f"ticker is down, so a later rejection will not be reported")
+    
+    def _report_order_update(self, order_id, watcher, update):
+        """Log a rejected order to the tab that placed it"""
+        symbol, log_func = watcher
+        if update.get('status') == 'REJECTED':
+            log_func(f"❌ Order {order_id} for {symbol} rejected: {update.get('status_message')}")
+    
+    def _pace_order(self):
+        """Space batch submissions ORDER_INTERVAL apart across every executor thread"""
+        with self.order_pace_lock:
+            now = time.monotonic()
+            wait = self.next_order_at - now
+            self.next_order_at = max(now, self.next_order_at) + ORDER_INTERVAL
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _paced_place_order(self, params):
+        """place_order for executor workers, taking its slot in the shared submission pacing"""
+        self._pace_order()
+        return self.kite.place_order(**params)
+    
+    def on_ticker_connect(self, ws, response):
+        self.ticker_connected = True
+        self._subscribe_ltp(ws, self.order_price_tokens)
+        self.log_message("Ticker connected")
+    
+    def on_ticker_close(self, ws, code, reason):
+        if ws is not self.kws:
+            return
+        self.ticker_connected = False
+        self.log_message(f"Ticker closed: {code} {reason}")
+    
+    def on_ticker_error(self, ws, code, reason):
+        self.log_message(f"Ticker error: {code} {reason}")
     
     def _update_prices_continuously(self, symbols, exchange="MCX"):
+        backoff = 2
+        # kite.ltp accepts up to 1000 instruments, so one request covers every selected symbol
+        instruments = [f"{exchange}:{symbol}" for symbol in symbols]
         while not self.price_update_event.is_set() and self.is_logged_in:
             try:
-                batch_size = 10
-                for i in range(0, len(symbols), batch_size):
-                    batch_symbols = symbols[i:i + batch_size]
-                    instruments = [f"{exchange}:{symbol}" for symbol in batch_symbols]
-                    ltp_data = self.kite.ltp(instruments)
-                    for instrument_key, data in ltp_data.items():
-                        symbol = instrument_key.replace(f"{exchange}:", "")
-                        self.current_prices[symbol] = data['last_price']
-                    time.sleep(0.2)
-                time.sleep(1)
+                ltp_data = self.fast_ltp(instruments)
+                self._cache_prices({instrument_key.split(":", 1)[1]: data['last_price']
+                                    for instrument_key, data in ltp_data.items()})
+                backoff = 2
+                # Wake as soon as stop_price_updates fires instead of finishing the full second
+                self.price_update_event.wait(1)
             except Exception as e:
                 self.log_message(f"Error in continuous price update: {e}")
-                time.sleep(2)
+                backoff = _backoff_sleep(backoff)
     
     # ---------- Futures Order Placement Methods ----------
     def place_futures_single_orders(self):
@@ -2355,7 +3000,7 @@ class ZerodhaTradingApp:
             order_type = self.futures_order_type.get()
             quantity_type = self.futures_quantity_type.get()
             base_quantity = int(self.futures_quantity_entry.get())
-            price = float(self.futures_price_entry.get()) if self.futures_price_entry.get() and float(self.futures_price_entry.get()) > 0 else 0
+            price = self._read_limit_price(self.futures_price_entry)
             symbols = list(self.selected_single_futures.keys())
             if not symbols:
                 messagebox.showerror("Error", "No symbols selected")
@@ -2378,11 +3023,11 @@ class ZerodhaTradingApp:
             buy_order_type = self.futures_buy_order_type.get()
             buy_quantity_type = self.futures_buy_quantity_type.get()
             buy_quantity = int(self.futures_buy_quantity_entry.get())
-            buy_price = float(self.futures_buy_price_entry.get()) if self.futures_buy_price_entry.get() and float(self.futures_buy_price_entry.get()) > 0 else 0
+            buy_price = self._read_limit_price(self.futures_buy_price_entry)
             sell_order_type = self.futures_sell_order_type.get()
             sell_quantity_type = self.futures_sell_quantity_type.get()
             sell_quantity = int(self.futures_sell_quantity_entry.get())
-            sell_price = float(self.futures_sell_price_entry.get()) if self.futures_sell_price_entry.get() and float(self.futures_sell_price_entry.get()) > 0 else 0
+            sell_price = self._read_limit_price(self.futures_sell_price_entry)
             buy_symbols = list(self.selected_buy_futures.keys())
             sell_symbols = list(self.selected_sell_futures.keys())
             all_symbols = buy_symbols + sell_symbols
@@ -2412,7 +3057,7 @@ class ZerodhaTradingApp:
             order_type = self.options_order_type.get()
             quantity_type = self.options_quantity_type.get()
             base_quantity = int(self.options_quantity_entry.get())
-            price = float(self.options_price_entry.get()) if self.options_price_entry.get() and float(self.options_price_entry.get()) > 0 else 0
+            price = self._read_limit_price(self.options_price_entry)
             symbols = list(self.selected_single_options.keys())
             if not symbols:
                 messagebox.showerror("Error", "No symbols selected")
@@ -2435,11 +3080,11 @@ class ZerodhaTradingApp:
             buy_order_type = self.options_buy_order_type.get()
             buy_quantity_type = self.options_buy_quantity_type.get()
             buy_quantity = int(self.options_buy_quantity_entry.get())
-            buy_price = float(self.options_buy_price_entry.get()) if self.options_buy_price_entry.get() and float(self.options_buy_price_entry.get()) > 0 else 0
+            buy_price = self._read_limit_price(self.options_buy_price_entry)
             sell_order_type = self.options_sell_order_type.get()
             sell_quantity_type = self.options_sell_quantity_type.get()
             sell_quantity = int(self.options_sell_quantity_entry.get())
-            sell_price = float(self.options_sell_price_entry.get()) if self.options_sell_price_entry.get() and float(self.options_sell_price_entry.get()) > 0 else 0
+            sell_price = self._read_limit_price(self.options_sell_price_entry)
             buy_symbols = list(self.selected_buy_options.keys())
             sell_symbols = list(self.selected_sell_options.keys())
             all_symbols = buy_symbols + sell_symbols
@@ -2469,7 +3114,7 @@ class ZerodhaTradingApp:
             order_type = self.nfo_options_order_type.get()
             quantity_type = self.nfo_options_quantity_type.get()
             base_quantity = int(self.nfo_options_quantity_entry.get())
-            price = float(self.nfo_options_price_entry.get()) if self.nfo_options_price_entry.get() and float(self.nfo_options_price_entry.get()) > 0 else 0
+            price = self._read_limit_price(self.nfo_options_price_entry)
             symbols = list(self.selected_nfo_single_options.keys())
             if not symbols:
                 messagebox.showerror("Error", "No symbols selected")
@@ -2492,11 +3137,11 @@ class ZerodhaTradingApp:
             buy_order_type = self.nfo_options_buy_order_type.get()
             buy_quantity_type = self.nfo_options_buy_quantity_type.get()
             buy_quantity = int(self.nfo_options_buy_quantity_entry.get())
-            buy_price = float(self.nfo_options_buy_price_entry.get()) if self.nfo_options_buy_price_entry.get() and float(self.nfo_options_buy_price_entry.get()) > 0 else 0
+            buy_price = self._read_limit_price(self.nfo_options_buy_price_entry)
             sell_order_type = self.nfo_options_sell_order_type.get()
             sell_quantity_type = self.nfo_options_sell_quantity_type.get()
             sell_quantity = int(self.nfo_options_sell_quantity_entry.get())
-            sell_price = float(self.nfo_options_sell_price_entry.get()) if self.nfo_options_sell_price_entry.get() and float(self.nfo_options_sell_price_entry.get()) > 0 else 0
+            sell_price = self._read_limit_price(self.nfo_options_sell_price_entry)
             buy_symbols = list(self.selected_nfo_buy_options.keys())
             sell_symbols = list(self.selected_nfo_sell_options.keys())
             all_symbols = buy_symbols + sell_symbols
@@ -2526,7 +3171,7 @@ class ZerodhaTradingApp:
             order_type = self.nse_options_order_type.get()
             quantity_type = self.nse_options_quantity_type.get()
             base_quantity = int(self.nse_options_quantity_entry.get())
-            price = float(self.nse_options_price_entry.get()) if self.nse_options_price_entry.get() and float(self.nse_options_price_entry.get()) > 0 else 0
+            price = self._read_limit_price(self.nse_options_price_entry)
             symbols = list(self.selected_nse_single_options.keys())
             if not symbols:
                 messagebox.showerror("Error", "No symbols selected")
@@ -2549,11 +3194,11 @@ class ZerodhaTradingApp:
             buy_order_type = self.nse_options_buy_order_type.get()
             buy_quantity_type = self.nse_options_buy_quantity_type.get()
             buy_quantity = int(self.nse_options_buy_quantity_entry.get())
-            buy_price = float(self.nse_options_buy_price_entry.get()) if self.nse_options_buy_price_entry.get() and float(self.nse_options_buy_price_entry.get()) > 0 else 0
+            buy_price = self._read_limit_price(self.nse_options_buy_price_entry)
             sell_order_type = self.nse_options_sell_order_type.get()
             sell_quantity_type = self.nse_options_sell_quantity_type.get()
             sell_quantity = int(self.nse_options_sell_quantity_entry.get())
-            sell_price = float(self.nse_options_sell_price_entry.get()) if self.nse_options_sell_price_entry.get() and float(self.nse_options_sell_price_entry.get()) > 0 else 0
+            sell_price = self._read_limit_price(self.nse_options_sell_price_entry)
             buy_symbols = list(self.selected_nse_buy_options.keys())
             sell_symbols = list(self.selected_nse_sell_options.keys())
             all_symbols = buy_symbols + sell_symbols
@@ -2626,13 +3271,22 @@ class ZerodhaTradingApp:
         # Get order parameters
         buy_order_type = buy_order_type_var.get()
         buy_quantity_type = buy_qty_type_var.get()
-        buy_qty = int(buy_qty_entry.get())
-        buy_price = float(buy_price_entry.get()) if buy_price_entry.get() and float(buy_price_entry.get()) > 0 else 0
+        buy_price = self._read_limit_price(buy_price_entry)
         
         sell_order_type = sell_order_type_var.get()
         sell_quantity_type = sell_qty_type_var.get()
-        sell_qty = int(sell_qty_entry.get())
-        sell_price = float(sell_price_entry.get()) if sell_price_entry.get() and float(sell_price_entry.get()) > 0 else 0
+        sell_price = self._read_limit_price(sell_price_entry)
+        
+        # Reject a bad quantity here, before any prices are subscribed or a leg can be sent on its own
+        try:
+            buy_qty = int(buy_qty_entry.get())
+            sell_qty = int(sell_qty_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid quantity value")
+            return
+        if buy_qty <= 0 or sell_qty <= 0:
+            messagebox.showerror("Error", "Quantity must be greater than zero for both legs")
+            return
         
         symbols = [buy_symbol, sell_symbol]
         self.start_price_updates_for_order(symbols, exchange)
@@ -2662,31 +3316,55 @@ class ZerodhaTradingApp:
         buy_frame = ttk.LabelFrame(main_frame, text="BUY Leg")
         buy_frame.pack(fill='x', pady=5)
         ttk.Label(buy_frame, text=f"Symbol: {buy_symbol}").pack(anchor='w', padx=5)
-        self.buy_price_label = ttk.Label(buy_frame, text="Fetching...", foreground='blue')
-        self.buy_price_label.pack(anchor='w', padx=5)
+        buy_price_label = ttk.Label(buy_frame, text="Fetching...", foreground='blue')
+        buy_price_label.pack(anchor='w', padx=5)
         ttk.Label(buy_frame, text=f"Qty: {buy_qty} ({buy_qtype}), Type: {buy_otype}").pack(anchor='w', padx=5)
         
         # Sell leg
         sell_frame = ttk.LabelFrame(main_frame, text="SELL Leg")
         sell_frame.pack(fill='x', pady=5)
         ttk.Label(sell_frame, text=f"Symbol: {sell_symbol}").pack(anchor='w', padx=5)
-        self.sell_price_label = ttk.Label(sell_frame, text="Fetching...", foreground='red')
-        self.sell_price_label.pack(anchor='w', padx=5)
+        sell_price_label = ttk.Label(sell_frame, text="Fetching...", foreground='red')
+        sell_price_label.pack(anchor='w', padx=5)
         ttk.Label(sell_frame, text=f"Qty: {sell_qty} ({sell_qtype}), Type: {sell_otype}").pack(anchor='w', padx=5)
         
         ttk.Label(main_frame, text=f"Max Margin: ₹{margin:.2f}").pack(pady=5)
+        required_label = ttk.Label(main_frame, text="Required Margin: calculating...")
+        required_label.pack(pady=5)
+        
+        def show_required_margin(required):
+            if not required_label.winfo_exists():
+                return
+            over = margin > 0 and required > margin
+            required_label.config(text=f"Required Margin: ₹{required:.2f}" + (" - exceeds max margin" if over else ""),
+                                  foreground='red' if over else 'green')
+        
+        def show_margin_unavailable(error):
+            if required_label.winfo_exists():
+                required_label.config(text="Required Margin: unavailable", foreground='red')
+        
+        # Both legs are priced in one basket-margin request while the user reviews the spread
+        legs = [("BUY", buy_symbol, self._leg_quantity(buy_qtype, buy_qty, buy_details), buy_otype,
+                 self._leg_price(buy_otype, buy_price)),
+                ("SELL", sell_symbol, self._leg_quantity(sell_qtype, sell_qty, sell_details), sell_otype,
+                 self._leg_price(sell_otype, sell_price))]
+        self._run_in_background(lambda: self._spread_margin(exchange, legs), show_required_margin, log_func,
+                                "Error calculating spread margin", show_margin_unavailable)
         
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=10)
         
         def confirm():
+            # Both legs wait on broker round-trips, so submit them off the Tk thread; a refused
+            # batch leaves the confirmation window open
+            if not self._start_order_batch(self._execute_spread_order, (
+                    buy_symbol, buy_details, buy_otype, buy_qtype, buy_qty, buy_price,
+                    sell_symbol, sell_details, sell_otype, sell_qtype, sell_qty, sell_price,
+                    exchange, log_func)):
+                return
             window.destroy()
             self.real_time_windows.remove(window)
             self.stop_price_updates()
-            self._execute_spread_order(
-                buy_symbol, buy_details, buy_otype, buy_qtype, buy_qty, buy_price,
-                sell_symbol, sell_details, sell_otype, sell_qtype, sell_qty, sell_price,
-                exchange, log_func)
         
         def cancel():
             window.destroy()
@@ -2696,105 +3374,97 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Confirm Spread", command=confirm).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        window.protocol("WM_DELETE_WINDOW", cancel)
         
         # Update prices periodically
-        self.update_spread_price_display(window)
+        self.update_spread_price_display({buy_symbol: buy_price_label}, {sell_symbol: sell_price_label}, window)
     
-    def update_spread_price_display(self, window):
+    def update_spread_price_display(self, buy_labels, sell_labels, window):
         if not window.winfo_exists():
             return
         try:
-            # We need to know the symbols from the window's labels - we stored them in instance vars for simplicity
-            if hasattr(self, 'buy_price_label') and self.buy_price_label.winfo_exists():
-                # Extract symbol from parent label text
-                parent = self.buy_price_label.master
-                for child in parent.winfo_children():
-                    if isinstance(child, ttk.Label) and "Symbol:" in child.cget("text"):
-                        buy_sym = child.cget("text").replace("Symbol: ", "").strip()
-                        break
-                else:
-                    buy_sym = None
-                if buy_sym:
-                    buy_price = self.current_prices.get(buy_sym)
-                    if buy_price:
-                        self.buy_price_label.config(text=f"LTP: ₹{buy_price:.2f}")
-                    else:
-                        self.buy_price_label.config(text="LTP: Unavailable")
-            if hasattr(self, 'sell_price_label') and self.sell_price_label.winfo_exists():
-                parent = self.sell_price_label.master
-                for child in parent.winfo_children():
-                    if isinstance(child, ttk.Label) and "Symbol:" in child.cget("text"):
-                        sell_sym = child.cget("text").replace("Symbol: ", "").strip()
-                        break
-                else:
-                    sell_sym = None
-                if sell_sym:
-                    sell_price = self.current_prices.get(sell_sym)
-                    if sell_price:
-                        self.sell_price_label.config(text=f"LTP: ₹{sell_price:.2f}")
-                    else:
-                        self.sell_price_label.config(text="LTP: Unavailable")
-        except:
-            pass
+            for symbol, label in buy_labels.items():
+                self._set_price_label(label, symbol, 'blue')
+            for symbol, label in sell_labels.items():
+                self._set_price_label(label, symbol, 'red')
+        except Exception as e:
+            print(f"Error updating spread price display: {e}")
         if window.winfo_exists():
-            window.after(1000, lambda: self.update_spread_price_display(window))
+            window.after(1000, lambda: self.update_spread_price_display(buy_labels, sell_labels, window))
     
     def _execute_spread_order(self, buy_symbol, buy_details, buy_otype, buy_qtype, buy_qty, buy_price,
                                sell_symbol, sell_details, sell_otype, sell_qtype, sell_qty, sell_price,
                                exchange, log_func):
+        """Place both spread legs; runs on a worker thread, so dialogs go through root.after"""
+        if buy_otype not in ORDER_TYPES or sell_otype not in ORDER_TYPES:
+            log_func(f"❌ Unsupported order type (BUY: {buy_otype}, SELL: {sell_otype}), aborting spread")
+            self.root.after(0, lambda: messagebox.showerror("Error", "Order type must be MARKET or LIMIT"))
+            return
+        
         # Get current prices
         buy_ltp = self.current_prices.get(buy_symbol)
         sell_ltp = self.current_prices.get(sell_symbol)
         if not buy_ltp or not sell_ltp:
             log_func("❌ Prices not available for both legs, aborting spread")
-            messagebox.showerror("Error", "Could not fetch current prices")
+            self.root.after(0, lambda: messagebox.showerror("Error", "Could not fetch current prices"))
             return
         
-        # Calculate quantities
-        if buy_qtype == "Lot Size":
-            buy_quantity = buy_qty * int(buy_details['lot_size'])
-        else:
-            buy_quantity = buy_qty
+        legs = [(side, symbol, self._leg_quantity(qtype, qty, details), otype, self._leg_price(otype, price))
+                for side, symbol, details, otype, qtype, qty, price in (
+                    ("BUY", buy_symbol, buy_details, buy_otype, buy_qtype, buy_qty, buy_price),
+                    ("SELL", sell_symbol, sell_details, sell_otype, sell_qtype, sell_qty, sell_price))]
+        if any(quantity <= 0 for side, symbol, quantity, otype, final in legs):
+            log_func("❌ Spread leg quantity must be positive, aborting spread")
+            self.root.after(0, lambda: messagebox.showerror("Error", "Quantity must be greater than zero for both legs"))
+            return
         
-        if sell_qtype == "Lot Size":
-            sell_quantity = sell_qty * int(sell_details['lot_size'])
+        # Place both legs concurrently so the fill skew between them is one round-trip, not two
+        futures = [
+            self.io_executor.submit(self.kite.place_order, **self._order_params(exchange, symbol, side, quantity, otype, final))
+            for side, symbol, quantity, otype, final in legs
+        ]
+        order_ids = {}
+        errors = []
+        # Both legs belong to one spread event, so they share one spread-log row
+        logged_legs = {}
+        for (side, symbol, quantity, otype, final), future in zip(legs, futures):
+            logged_legs[side] = {'symbol': symbol, 'quantity': quantity, 'order_type': otype, 'price': final}
+            try:
+                order_id = future.result()
+            except Exception as e:
+                log_func(f"❌ Spread {side} leg failed for {symbol}: {e}")
+                errors.append(f"{side} {symbol}: {e}")
+                continue
+            order_ids[side] = order_id
+            logged_legs[side]['order_id'] = order_id
+            log_func(f"Spread {side} placed: {symbol} {quantity} @ {final if final else 'MARKET'} - ID: {order_id}")
+        if order_ids:
+            self.log_spread_trade("ENTRY", exchange, logged_legs['BUY'], logged_legs['SELL'])
+        
+        if errors:
+            self.root.after(0, lambda: messagebox.showerror("Error", "Spread order failed:\n" + "\n".join(errors)))
         else:
-            sell_quantity = sell_qty
-        
-        # Determine final limit prices
-        buy_final = buy_price if buy_otype == "LIMIT" and buy_price > 0 else None
-        sell_final = sell_price if sell_otype == "LIMIT" and sell_price > 0 else None
-        
-        # Place orders
-        try:
-            buy_order_id = self.kite.place_order(
-                variety=self.kite.VARIETY_REGULAR,
-                exchange=exchange,
-                tradingsymbol=buy_symbol,
-                transaction_type="BUY",
-                quantity=buy_quantity,
-                order_type=buy_otype,
-                product=self.kite.PRODUCT_NRML,
-                price=buy_final
-            )
-            log_func(f"Spread BUY placed: {buy_symbol} {buy_quantity} @ {buy_final if buy_final else 'MARKET'} - ID: {buy_order_id}")
-            
-            sell_order_id = self.kite.place_order(
-                variety=self.kite.VARIETY_REGULAR,
-                exchange=exchange,
-                tradingsymbol=sell_symbol,
-                transaction_type="SELL",
-                quantity=sell_quantity,
-                order_type=sell_otype,
-                product=self.kite.PRODUCT_NRML,
-                price=sell_final
-            )
-            log_func(f"Spread SELL placed: {sell_symbol} {sell_quantity} @ {sell_final if sell_final else 'MARKET'} - ID: {sell_order_id}")
-            
-            messagebox.showinfo("Spread Orders Placed", f"BUY ID: {buy_order_id}\nSELL ID: {sell_order_id}")
-        except Exception as e:
-            log_func(f"❌ Spread order failed: {e}")
-            messagebox.showerror("Error", f"Spread order failed: {e}")
+            self.root.after(0, lambda: self.show_toast(
+                f"Spread placed - BUY ID: {order_ids['BUY']} | SELL ID: {order_ids['SELL']}"))
+    
+    def _leg_quantity(self, qtype, qty, details):
+        """Order quantity for a spread leg, scaling by lot size when the qty is in lots"""
+        if qtype == "Lot Size":
+            return qty * int(details['lot_size'])
+        return qty
+    
+    def _leg_price(self, otype, price):
+        """Limit price for a spread leg; None sends it at market"""
+        return price if otype == "LIMIT" and price > 0 else None
+    
+    def _spread_margin(self, exchange, legs):
+        """Margin Kite would block for both spread legs together, from one basket-margin call"""
+        margins = self.kite.basket_order_margins(
+            [self._order_params(exchange, symbol, side, quantity, otype, final)
+             for side, symbol, quantity, otype, final in legs],
+            consider_positions=True, mode='compact')
+        return margins['final']['total']
     
     def _exit_spread(self, exchange, buy_dict, sell_dict, log_func):
         """Square off both legs by placing opposite market orders."""
@@ -2806,52 +3476,62 @@ class ZerodhaTradingApp:
         buy_symbol = list(buy_dict.keys())[0]
         sell_symbol = list(sell_dict.keys())[0]
         
-        # Get current positions for these symbols
-        try:
-            positions = self.kite.positions()
-            # Find net position for each symbol
-            buy_position_qty = 0
-            sell_position_qty = 0
-            for pos in positions['net']:
-                if pos['tradingsymbol'] == buy_symbol and pos['quantity'] != 0:
-                    buy_position_qty = pos['quantity']  # positive if long
-                if pos['tradingsymbol'] == sell_symbol and pos['quantity'] != 0:
-                    sell_position_qty = pos['quantity']  # negative if short
-            
-            # Exit buy leg: if long, sell
-            if buy_position_qty > 0:
-                order_id = self.kite.place_order(
-                    variety=self.kite.VARIETY_REGULAR,
-                    exchange=exchange,
-                    tradingsymbol=buy_symbol,
-                    transaction_type="SELL",
-                    quantity=abs(buy_position_qty),
-                    order_type=self.kite.ORDER_TYPE_MARKET,
-                    product=self.kite.PRODUCT_NRML
-                )
-                log_func(f"Exited BUY leg: {buy_symbol} SELL {abs(buy_position_qty)} - ID: {order_id}")
-            else:
-                log_func(f"No long position found for {buy_symbol}")
-            
-            # Exit sell leg: if short, buy
-            if sell_position_qty < 0:
-                order_id = self.kite.place_order(
-                    variety=self.kite.VARIETY_REGULAR,
-                    exchange=exchange,
-                    tradingsymbol=sell_symbol,
-                    transaction_type="BUY",
-                    quantity=abs(sell_position_qty),
-                    order_type=self.kite.ORDER_TYPE_MARKET,
-                    product=self.kite.PRODUCT_NRML
-                )
-                log_func(f"Exited SELL leg: {sell_symbol} BUY {abs(sell_position_qty)} - ID: {order_id}")
-            else:
-                log_func(f"No short position found for {sell_symbol}")
+        def exit_spread_legs():
+            # Get current positions for these symbols
+            try:
+                positions = self.kite.positions()
+                # Find net position for each symbol
+                buy_position_qty = 0
+                sell_position_qty = 0
+                combined_pnl = 0
+                for pos in positions['net']:
+                    if pos['tradingsymbol'] == buy_symbol and pos['quantity'] != 0:
+                        buy_position_qty = pos['quantity']  # positive if long
+                        combined_pnl += pos['pnl']
+                    if pos['tradingsymbol'] == sell_symbol and pos['quantity'] != 0:
+                        sell_position_qty = pos['quantity']  # negative if short
+                        combined_pnl += pos['pnl']
+                
+                # Exit buy leg (if long, sell) and sell leg (if short, buy) concurrently
+                exits = []
+                if buy_position_qty > 0:
+                    exits.append(("BUY", buy_symbol, "SELL", abs(buy_position_qty)))
+                else:
+                    log_func(f"No long position found for {buy_symbol}")
+                if sell_position_qty < 0:
+                    exits.append(("SELL", sell_symbol, "BUY", abs(sell_position_qty)))
+                else:
+                    log_func(f"No short position found for {sell_symbol}")
+                
+                futures = [
+                    self.io_executor.submit(self.kite.place_order, **self._order_params(exchange, symbol, transaction, quantity))
+                    for leg, symbol, transaction, quantity in exits
+                ]
+                logged_legs = {"BUY": {'symbol': buy_symbol}, "SELL": {'symbol': sell_symbol}}
+                placed = False
+                for (leg, symbol, transaction, quantity), future in zip(exits, futures):
+                    logged_legs[leg].update(quantity=quantity, order_type="MARKET")
+                    try:
+                        order_id = future.result()
+                    except Exception as e:
+                        log_func(f"❌ Error exiting {leg} leg {symbol}: {e}")
+                        continue
+                    placed = True
+                    logged_legs[leg]['order_id'] = order_id
+                    log_func(f"Exited {leg} leg: {symbol} {transaction} {quantity} - ID: {order_id}")
+                if placed:
+                    self.log_spread_trade("EXIT", exchange, logged_legs["BUY"], logged_legs["SELL"], combined_pnl)
+                
+                self.root.after(0, lambda: self.show_toast("Spread exit orders placed. Check log for details."))
+            except Exception as e:
+                log_func(f"❌ Error exiting spread: {e}")
+                error = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Exit failed: {error}"))
             
-            messagebox.showinfo("Spread Exit", "Exit orders placed. Check log for details.")
-        except Exception as e:
-            log_func(f"❌ Error exiting spread: {e}")
-            messagebox.showerror("Error", f"Exit failed: {e}")
+        # Positions lookup and both exit orders are broker round-trips; keep them off the Tk thread.
+        # The batch slot also refuses a second click until this exit is done, so both exits
+        # cannot size their orders from the same pre-fill positions
+        self._start_order_batch(exit_spread_legs, ())
     
     # ---------- Strategy Execution ----------
     def execute_options_strategy(self):
@@ -2933,11 +3613,13 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_futures_single_orders_with_current_prices,
+                                           (transaction, order_type, quantity_type, base_quantity, price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_futures_single_orders_with_current_prices,
-                   args=(transaction, order_type, quantity_type, base_quantity, price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -2948,6 +3630,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place Futures Orders Now", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_futures_price_display(price_labels, price_window)
     
@@ -2956,11 +3640,7 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in price_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='blue')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'blue')
         except Exception as e:
             print(f"Error updating futures price display: {e}")
         if window.winfo_exists():
@@ -3017,12 +3697,14 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_futures_buy_sell_orders_with_current_prices,
+                                           (buy_order_type, buy_quantity_type, buy_quantity, buy_price,
+                                            sell_order_type, sell_quantity_type, sell_quantity, sell_price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_futures_buy_sell_orders_with_current_prices,
-                   args=(buy_order_type, buy_quantity_type, buy_quantity, buy_price,
-                         sell_order_type, sell_quantity_type, sell_quantity, sell_price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3033,6 +3715,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place BUY & SELL Futures Orders", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_futures_buy_sell_price_display(buy_price_labels, sell_price_labels, price_window)
     
@@ -3041,17 +3725,9 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in buy_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='green')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'green')
             for symbol, label in sell_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='red')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'red')
         except Exception as e:
             print(f"Error updating futures buy/sell price display: {e}")
         if window.winfo_exists():
@@ -3093,11 +3769,13 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_options_single_orders_with_current_prices,
+                                           (transaction, order_type, quantity_type, base_quantity, price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_options_single_orders_with_current_prices,
-                   args=(transaction, order_type, quantity_type, base_quantity, price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3108,6 +3786,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place MCX Options Orders Now", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_options_price_display(price_labels, price_window)
     
@@ -3116,11 +3796,7 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in price_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='blue')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'blue')
         except Exception as e:
             print(f"Error updating options price display: {e}")
         if window.winfo_exists():
@@ -3177,12 +3853,14 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_options_buy_sell_orders_with_current_prices,
+                                           (buy_order_type, buy_quantity_type, buy_quantity, buy_price,
+                                            sell_order_type, sell_quantity_type, sell_quantity, sell_price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_options_buy_sell_orders_with_current_prices,
-                   args=(buy_order_type, buy_quantity_type, buy_quantity, buy_price,
-                         sell_order_type, sell_quantity_type, sell_quantity, sell_price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3193,6 +3871,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place BUY & SELL MCX Options Orders", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_options_buy_sell_price_display(buy_price_labels, sell_price_labels, price_window)
     
@@ -3201,17 +3881,9 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in buy_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='green')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'green')
             for symbol, label in sell_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='red')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'red')
         except Exception as e:
             print(f"Error updating options buy/sell price display: {e}")
         if window.winfo_exists():
@@ -3251,11 +3923,13 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_nfo_options_single_orders_with_current_prices,
+                                           (transaction, order_type, quantity_type, base_quantity, price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_nfo_options_single_orders_with_current_prices,
-                   args=(transaction, order_type, quantity_type, base_quantity, price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3266,6 +3940,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place NFO Options Orders Now", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_nfo_options_price_display(price_labels, price_window)
     
@@ -3274,11 +3950,7 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in price_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='blue')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'blue')
         except Exception as e:
             print(f"Error updating NFO options price display: {e}")
         if window.winfo_exists():
@@ -3334,12 +4006,14 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_nfo_options_buy_sell_orders_with_current_prices,
+                                           (buy_order_type, buy_quantity_type, buy_quantity, buy_price,
+                                            sell_order_type, sell_quantity_type, sell_quantity, sell_price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_nfo_options_buy_sell_orders_with_current_prices,
-                   args=(buy_order_type, buy_quantity_type, buy_quantity, buy_price,
-                         sell_order_type, sell_quantity_type, sell_quantity, sell_price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3350,6 +4024,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place BUY & SELL NFO Options Orders", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_nfo_options_buy_sell_price_display(buy_price_labels, sell_price_labels, price_window)
     
@@ -3358,17 +4034,9 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in buy_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='green')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'green')
             for symbol, label in sell_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='red')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'red')
         except Exception as e:
             print(f"Error updating NFO options buy/sell price display: {e}")
         if window.winfo_exists():
@@ -3408,11 +4076,13 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_nse_options_single_orders_with_current_prices,
+                                           (transaction, order_type, quantity_type, base_quantity, price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_nse_options_single_orders_with_current_prices,
-                   args=(transaction, order_type, quantity_type, base_quantity, price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3423,6 +4093,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place NSE Options Orders Now", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_nse_options_price_display(price_labels, price_window)
     
@@ -3431,11 +4103,7 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in price_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='blue')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'blue')
         except Exception as e:
             print(f"Error updating NSE options price display: {e}")
         if window.winfo_exists():
@@ -3491,12 +4159,14 @@ class ZerodhaTradingApp:
         button_frame.pack(fill='x', pady=10)
         
         def place_orders_now():
+            # A refused batch must leave this window and its price stream as they are
+            if not self._start_order_batch(self.execute_nse_options_buy_sell_orders_with_current_prices,
+                                           (buy_order_type, buy_quantity_type, buy_quantity, buy_price,
+                                            sell_order_type, sell_quantity_type, sell_quantity, sell_price)):
+                return
             price_window.destroy()
             self.stop_price_updates()
             self.real_time_windows.remove(price_window)
-            Thread(target=self.execute_nse_options_buy_sell_orders_with_current_prices,
-                   args=(buy_order_type, buy_quantity_type, buy_quantity, buy_price,
-                         sell_order_type, sell_quantity_type, sell_quantity, sell_price), daemon=True).start()
         
         def cancel_orders():
             price_window.destroy()
@@ -3507,6 +4177,8 @@ class ZerodhaTradingApp:
         
         ttk.Button(button_frame, text="Place BUY & SELL NSE Options Orders", command=place_orders_now).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Cancel", command=cancel_orders).pack(side='left', padx=5)
+        # Closing from the title bar must release the price stream like Cancel does
+        price_window.protocol("WM_DELETE_WINDOW", cancel_orders)
         
         self.update_nse_options_buy_sell_price_display(buy_price_labels, sell_price_labels, price_window)
     
@@ -3515,17 +4187,9 @@ class ZerodhaTradingApp:
             return
         try:
             for symbol, label in buy_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='green')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'green')
             for symbol, label in sell_labels.items():
-                current_price = self.current_prices.get(symbol)
-                if current_price:
-                    label.config(text=f"₹{current_price:.2f}", foreground='red')
-                else:
-                    label.config(text="Price unavailable", foreground='red')
+                self._set_price_label(label, symbol, 'red')
         except Exception as e:
             print(f"Error updating NSE options buy/sell price display: {e}")
         if window.winfo_exists():
@@ -3536,17 +4200,17 @@ class ZerodhaTradingApp:
         orders_placed = 0
         total_orders = len(self.selected_single_futures)
         self.log_futures_message(f"Starting to place {total_orders} {transaction} futures orders with real-time prices...")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_single_futures) if not self.current_prices.get(s)], "MCX")
         for symbol, details in self.selected_single_futures.items():
             try:
                 current_price = self.current_prices.get(symbol)
                 if not current_price:
-                    try:
-                        ltp_data = self.kite.ltp(f"MCX:{symbol}")
-                        current_price = list(ltp_data.values())[0]['last_price']
-                        self.log_futures_message(f"Fetched current LTP for {symbol}: {current_price}")
-                    except:
+                    current_price = self.get_current_price(symbol, "MCX")
+                    if current_price is None:
                         self.log_futures_message(f"❌ Could not fetch LTP for {symbol}, skipping...")
                         continue
+                    self.log_futures_message(f"Fetched current LTP for {symbol}: {current_price}")
                 if quantity_type == "Lot Size":
                     lot_size = int(details['lot_size'])
                     quantity = base_quantity * lot_size
@@ -3562,25 +4226,18 @@ class ZerodhaTradingApp:
                     else:
                         final_price = price
                     self.log_futures_message(f"Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                order_id = self.kite.place_order(
-                    variety=self.kite.VARIETY_REGULAR,
-                    exchange="MCX",
-                    tradingsymbol=symbol,
-                    transaction_type=transaction,
-                    quantity=quantity,
-                    order_type=order_type,
-                    product=self.kite.PRODUCT_NRML,
-                    price=final_price if order_type == "LIMIT" else None
-                )
+                self._pace_order()
+                order_id = self.kite.place_order(**self._order_params("MCX", symbol, transaction, quantity, order_type, final_price))
                 orders_placed += 1
                 self.log_futures_message(f"✅ {transaction} Futures Order {orders_placed}/{total_orders}: {symbol} {quantity} @ {final_price if order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                time.sleep(1)
+                self.log_trade("MCX", symbol, transaction, quantity, order_type, final_price if order_type == "LIMIT" else None, order_id)
+                self.watch_order(order_id, symbol, self.log_futures_message)
             except Exception as e:
                 self.log_futures_message(f"❌ Failed to place {transaction} futures order for {symbol}: {e}")
         self.log_futures_message(f"{transaction} futures order placement completed: {orders_placed}/{total_orders} successful")
         def show_summary():
             if orders_placed == total_orders:
-                messagebox.showinfo("Success", f"All {orders_placed} {transaction} futures orders placed successfully!")
+                self.show_toast(f"All {orders_placed} {transaction} futures orders placed successfully!")
             else:
                 messagebox.showwarning("Partial Success", f"{orders_placed} out of {total_orders} {transaction} futures orders placed successfully")
         self.root.after(0, show_summary)
@@ -3589,106 +4246,101 @@ class ZerodhaTradingApp:
                                                           sell_order_type, sell_quantity_type, sell_quantity, sell_price):
         total_buy_orders = len(self.selected_buy_futures)
         total_sell_orders = len(self.selected_sell_futures)
-        buy_orders_placed = 0
-        sell_orders_placed = 0
         self.log_futures_message(f"Starting to place {total_buy_orders} BUY and {total_sell_orders} SELL futures orders with real-time prices...")
-        if total_buy_orders > 0:
-            self.log_futures_message("=== PLACING BUY FUTURES ORDERS ===")
-            for symbol, details in self.selected_buy_futures.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"MCX:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_futures_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
-                            continue
-                    if buy_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = buy_quantity * lot_size
-                    else:
-                        quantity = buy_quantity
-                    final_price = buy_price
-                    if buy_order_type == "LIMIT":
-                        if buy_price == 0:
-                            final_price = current_price * 0.995
-                        self.log_futures_message(f"BUY Futures Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="MCX",
-                        tradingsymbol=symbol,
-                        transaction_type="BUY",
-                        quantity=quantity,
-                        order_type=buy_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if buy_order_type == "LIMIT" else None
-                    )
-                    buy_orders_placed += 1
-                    self.log_futures_message(f"✅ BUY Futures Order {buy_orders_placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_futures_message(f"❌ Failed to place BUY futures order for {symbol}: {e}")
-        if total_sell_orders > 0:
-            self.log_futures_message("=== PLACING SELL FUTURES ORDERS ===")
-            for symbol, details in self.selected_sell_futures.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"MCX:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_futures_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
-                            continue
-                    if sell_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = sell_quantity * lot_size
-                    else:
-                        quantity = sell_quantity
-                    final_price = sell_price
-                    if sell_order_type == "LIMIT":
-                        if sell_price == 0:
-                            final_price = current_price * 1.005
-                        self.log_futures_message(f"SELL Futures Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="MCX",
-                        tradingsymbol=symbol,
-                        transaction_type="SELL",
-                        quantity=quantity,
-                        order_type=sell_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if sell_order_type == "LIMIT" else None
-                    )
-                    sell_orders_placed += 1
-                    self.log_futures_message(f"✅ SELL Futures Order {sell_orders_placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_futures_message(f"❌ Failed to place SELL futures order for {symbol}: {e}")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_buy_futures) + list(self.selected_sell_futures) if not self.current_prices.get(s)], "MCX")
+        def place_buys():
+            placed = 0
+            if total_buy_orders > 0:
+                self.log_futures_message("=== PLACING BUY FUTURES ORDERS ===")
+                for symbol, details in self.selected_buy_futures.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "MCX")
+                            if current_price is None:
+                                self.log_futures_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
+                                continue
+                        if buy_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = buy_quantity * lot_size
+                        else:
+                            quantity = buy_quantity
+                        final_price = buy_price
+                        if buy_order_type == "LIMIT":
+                            if buy_price == 0:
+                                final_price = current_price * 0.995
+                            self.log_futures_message(f"BUY Futures Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("MCX", symbol, "BUY", quantity, buy_order_type, final_price))
+                        placed += 1
+                        self.log_futures_message(f"✅ BUY Futures Order {placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("MCX", symbol, "BUY", quantity, buy_order_type, final_price if buy_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_futures_message)
+                    except Exception as e:
+                        self.log_futures_message(f"❌ Failed to place BUY futures order for {symbol}: {e}")
+            return placed
+        def place_sells():
+            placed = 0
+            if total_sell_orders > 0:
+                self.log_futures_message("=== PLACING SELL FUTURES ORDERS ===")
+                for symbol, details in self.selected_sell_futures.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "MCX")
+                            if current_price is None:
+                                self.log_futures_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
+                                continue
+                        if sell_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = sell_quantity * lot_size
+                        else:
+                            quantity = sell_quantity
+                        final_price = sell_price
+                        if sell_order_type == "LIMIT":
+                            if sell_price == 0:
+                                final_price = current_price * 1.005
+                            self.log_futures_message(f"SELL Futures Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("MCX", symbol, "SELL", quantity, sell_order_type, final_price))
+                        placed += 1
+                        self.log_futures_message(f"✅ SELL Futures Order {placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("MCX", symbol, "SELL", quantity, sell_order_type, final_price if sell_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_futures_message)
+                    except Exception as e:
+                        self.log_futures_message(f"❌ Failed to place SELL futures order for {symbol}: {e}")
+            return placed
+        # BUY and SELL legs go out concurrently, so the basket takes the longer leg's time, not the sum
+        sells = self.io_executor.submit(place_sells)
+        buy_orders_placed = place_buys()
+        sell_orders_placed = sells.result()
         self.log_futures_message("=== FUTURES ORDER PLACEMENT SUMMARY ===")
         self.log_futures_message(f"BUY Futures Orders: {buy_orders_placed}/{total_buy_orders} successful")
         self.log_futures_message(f"SELL Futures Orders: {sell_orders_placed}/{total_sell_orders} successful")
         def show_final_summary():
-            messagebox.showinfo("Buy & Sell Futures Orders Completed",
-                f"BUY Futures Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL Futures Orders: {sell_orders_placed}/{total_sell_orders} successful")
+            summary = f"BUY Futures Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL Futures Orders: {sell_orders_placed}/{total_sell_orders} successful"
+            if buy_orders_placed == total_buy_orders and sell_orders_placed == total_sell_orders:
+                self.show_toast(summary.replace("\n", " | "))
+            else:
+                messagebox.showwarning("Buy & Sell Futures Orders Completed", summary)
         self.root.after(0, show_final_summary)
     
     def execute_options_single_orders_with_current_prices(self, transaction, order_type, quantity_type, base_quantity, price):
         orders_placed = 0
         total_orders = len(self.selected_single_options)
         self.log_options_message(f"Starting to place {total_orders} {transaction} MCX options orders with real-time prices...")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_single_options) if not self.current_prices.get(s)], "MCX")
         for symbol, details in self.selected_single_options.items():
             try:
                 current_price = self.current_prices.get(symbol)
                 if not current_price:
-                    try:
-                        ltp_data = self.kite.ltp(f"MCX:{symbol}")
-                        current_price = list(ltp_data.values())[0]['last_price']
-                        self.log_options_message(f"Fetched current LTP for {symbol}: {current_price}")
-                    except:
+                    current_price = self.get_current_price(symbol, "MCX")
+                    if current_price is None:
                         self.log_options_message(f"❌ Could not fetch LTP for {symbol}, skipping...")
                         continue
+                    self.log_options_message(f"Fetched current LTP for {symbol}: {current_price}")
                 if quantity_type == "Lot Size":
                     lot_size = int(details['lot_size'])
                     quantity = base_quantity * lot_size
@@ -3712,25 +4364,18 @@ class ZerodhaTradingApp:
                         self.log_options_message(f"Auto limit for {symbol}: Using {self.options_offset_type.get()} offset {self.options_limit_offset.get()} -> price {final_price:.2f} (LTP: {current_price:.2f})")
                     else:
                         final_price = price
-                order_id = self.kite.place_order(
-                    variety=self.kite.VARIETY_REGULAR,
-                    exchange="MCX",
-                    tradingsymbol=symbol,
-                    transaction_type=transaction,
-                    quantity=quantity,
-                    order_type=order_type,
-                    product=self.kite.PRODUCT_NRML,
-                    price=final_price if order_type == "LIMIT" else None
-                )
+                self._pace_order()
+                order_id = self.kite.place_order(**self._order_params("MCX", symbol, transaction, quantity, order_type, final_price))
                 orders_placed += 1
                 self.log_options_message(f"✅ {transaction} MCX Options Order {orders_placed}/{total_orders}: {symbol} {quantity} @ {final_price if order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                time.sleep(1)
+                self.log_trade("MCX", symbol, transaction, quantity, order_type, final_price if order_type == "LIMIT" else None, order_id)
+                self.watch_order(order_id, symbol, self.log_options_message)
             except Exception as e:
                 self.log_options_message(f"❌ Failed to place {transaction} MCX options order for {symbol}: {e}")
         self.log_options_message(f"{transaction} MCX options order placement completed: {orders_placed}/{total_orders} successful")
         def show_summary():
             if orders_placed == total_orders:
-                messagebox.showinfo("Success", f"All {orders_placed} {transaction} MCX options orders placed successfully!")
+                self.show_toast(f"All {orders_placed} {transaction} MCX options orders placed successfully!")
             else:
                 messagebox.showwarning("Partial Success", f"{orders_placed} out of {total_orders} {transaction} MCX options orders placed successfully")
         self.root.after(0, show_summary)
@@ -3739,89 +4384,84 @@ class ZerodhaTradingApp:
                                                           sell_order_type, sell_quantity_type, sell_quantity, sell_price):
         total_buy_orders = len(self.selected_buy_options)
         total_sell_orders = len(self.selected_sell_options)
-        buy_orders_placed = 0
-        sell_orders_placed = 0
         self.log_options_message(f"Starting to place {total_buy_orders} BUY and {total_sell_orders} SELL MCX options orders with real-time prices...")
-        if total_buy_orders > 0:
-            self.log_options_message("=== PLACING BUY MCX OPTIONS ORDERS ===")
-            for symbol, details in self.selected_buy_options.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"MCX:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_options_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
-                            continue
-                    if buy_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = buy_quantity * lot_size
-                    else:
-                        quantity = buy_quantity
-                    final_price = buy_price
-                    if buy_order_type == "LIMIT":
-                        if buy_price == 0:
-                            final_price = current_price * 0.995
-                        self.log_options_message(f"BUY MCX Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="MCX",
-                        tradingsymbol=symbol,
-                        transaction_type="BUY",
-                        quantity=quantity,
-                        order_type=buy_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if buy_order_type == "LIMIT" else None
-                    )
-                    buy_orders_placed += 1
-                    self.log_options_message(f"✅ BUY MCX Options Order {buy_orders_placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_options_message(f"❌ Failed to place BUY MCX options order for {symbol}: {e}")
-        if total_sell_orders > 0:
-            self.log_options_message("=== PLACING SELL MCX OPTIONS ORDERS ===")
-            for symbol, details in self.selected_sell_options.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"MCX:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_options_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
-                            continue
-                    if sell_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = sell_quantity * lot_size
-                    else:
-                        quantity = sell_quantity
-                    final_price = sell_price
-                    if sell_order_type == "LIMIT":
-                        if sell_price == 0:
-                            final_price = current_price * 1.005
-                        self.log_options_message(f"SELL MCX Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="MCX",
-                        tradingsymbol=symbol,
-                        transaction_type="SELL",
-                        quantity=quantity,
-                        order_type=sell_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if sell_order_type == "LIMIT" else None
-                    )
-                    sell_orders_placed += 1
-                    self.log_options_message(f"✅ SELL MCX Options Order {sell_orders_placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_options_message(f"❌ Failed to place SELL MCX options order for {symbol}: {e}")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_buy_options) + list(self.selected_sell_options) if not self.current_prices.get(s)], "MCX")
+        def place_buys():
+            placed = 0
+            if total_buy_orders > 0:
+                self.log_options_message("=== PLACING BUY MCX OPTIONS ORDERS ===")
+                for symbol, details in self.selected_buy_options.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "MCX")
+                            if current_price is None:
+                                self.log_options_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
+                                continue
+                        if buy_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = buy_quantity * lot_size
+                        else:
+                            quantity = buy_quantity
+                        final_price = buy_price
+                        if buy_order_type == "LIMIT":
+                            if buy_price == 0:
+                                final_price = current_price * 0.995
+                            self.log_options_message(f"BUY MCX Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("MCX", symbol, "BUY", quantity, buy_order_type, final_price))
+                        placed += 1
+                        self.log_options_message(f"✅ BUY MCX Options Order {placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("MCX", symbol, "BUY", quantity, buy_order_type, final_price if buy_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_options_message)
+                    except Exception as e:
+                        self.log_options_message(f"❌ Failed to place BUY MCX options order for {symbol}: {e}")
+            return placed
+        def place_sells():
+            placed = 0
+            if total_sell_orders > 0:
+                self.log_options_message("=== PLACING SELL MCX OPTIONS ORDERS ===")
+                for symbol, details in self.selected_sell_options.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "MCX")
+                            if current_price is None:
+                                self.log_options_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
+                                continue
+                        if sell_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = sell_quantity * lot_size
+                        else:
+                            quantity = sell_quantity
+                        final_price = sell_price
+                        if sell_order_type == "LIMIT":
+                            if sell_price == 0:
+                                final_price = current_price * 1.005
+                            self.log_options_message(f"SELL MCX Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("MCX", symbol, "SELL", quantity, sell_order_type, final_price))
+                        placed += 1
+                        self.log_options_message(f"✅ SELL MCX Options Order {placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("MCX", symbol, "SELL", quantity, sell_order_type, final_price if sell_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_options_message)
+                    except Exception as e:
+                        self.log_options_message(f"❌ Failed to place SELL MCX options order for {symbol}: {e}")
+            return placed
+        # BUY and SELL legs go out concurrently, so the basket takes the longer leg's time, not the sum
+        sells = self.io_executor.submit(place_sells)
+        buy_orders_placed = place_buys()
+        sell_orders_placed = sells.result()
         self.log_options_message("=== MCX OPTIONS ORDER PLACEMENT SUMMARY ===")
         self.log_options_message(f"BUY MCX Options Orders: {buy_orders_placed}/{total_buy_orders} successful")
         self.log_options_message(f"SELL MCX Options Orders: {sell_orders_placed}/{total_sell_orders} successful")
         def show_final_summary():
-            messagebox.showinfo("Buy & Sell MCX Options Orders Completed",
-                f"BUY MCX Options Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL MCX Options Orders: {sell_orders_placed}/{total_sell_orders} successful")
+            summary = f"BUY MCX Options Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL MCX Options Orders: {sell_orders_placed}/{total_sell_orders} successful"
+            if buy_orders_placed == total_buy_orders and sell_orders_placed == total_sell_orders:
+                self.show_toast(summary.replace("\n", " | "))
+            else:
+                messagebox.showwarning("Buy & Sell MCX Options Orders Completed", summary)
         self.root.after(0, show_final_summary)
     
     # NFO order execution
@@ -3829,17 +4469,17 @@ class ZerodhaTradingApp:
         orders_placed = 0
         total_orders = len(self.selected_nfo_single_options)
         self.log_nfo_options_message(f"Starting to place {total_orders} {transaction} NFO options orders with real-time prices...")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_nfo_single_options) if not self.current_prices.get(s)], "NFO")
         for symbol, details in self.selected_nfo_single_options.items():
             try:
                 current_price = self.current_prices.get(symbol)
                 if not current_price:
-                    try:
-                        ltp_data = self.kite.ltp(f"NFO:{symbol}")
-                        current_price = list(ltp_data.values())[0]['last_price']
-                        self.log_nfo_options_message(f"Fetched current LTP for {symbol}: {current_price}")
-                    except:
+                    current_price = self.get_current_price(symbol, "NFO")
+                    if current_price is None:
                         self.log_nfo_options_message(f"❌ Could not fetch LTP for {symbol}, skipping...")
                         continue
+                    self.log_nfo_options_message(f"Fetched current LTP for {symbol}: {current_price}")
                 if quantity_type == "Lot Size":
                     lot_size = int(details['lot_size'])
                     quantity = base_quantity * lot_size
@@ -3855,25 +4495,18 @@ class ZerodhaTradingApp:
                     else:
                         final_price = price
                     self.log_nfo_options_message(f"Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                order_id = self.kite.place_order(
-                    variety=self.kite.VARIETY_REGULAR,
-                    exchange="NFO",
-                    tradingsymbol=symbol,
-                    transaction_type=transaction,
-                    quantity=quantity,
-                    order_type=order_type,
-                    product=self.kite.PRODUCT_NRML,
-                    price=final_price if order_type == "LIMIT" else None
-                )
+                self._pace_order()
+                order_id = self.kite.place_order(**self._order_params("NFO", symbol, transaction, quantity, order_type, final_price))
                 orders_placed += 1
                 self.log_nfo_options_message(f"✅ {transaction} NFO Options Order {orders_placed}/{total_orders}: {symbol} {quantity} @ {final_price if order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                time.sleep(1)
+                self.log_trade("NFO", symbol, transaction, quantity, order_type, final_price if order_type == "LIMIT" else None, order_id)
+                self.watch_order(order_id, symbol, self.log_nfo_options_message)
             except Exception as e:
                 self.log_nfo_options_message(f"❌ Failed to place {transaction} NFO options order for {symbol}: {e}")
         self.log_nfo_options_message(f"{transaction} NFO options order placement completed: {orders_placed}/{total_orders} successful")
         def show_summary():
             if orders_placed == total_orders:
-                messagebox.showinfo("Success", f"All {orders_placed} {transaction} NFO options orders placed successfully!")
+                self.show_toast(f"All {orders_placed} {transaction} NFO options orders placed successfully!")
             else:
                 messagebox.showwarning("Partial Success", f"{orders_placed} out of {total_orders} {transaction} NFO options orders placed successfully")
         self.root.after(0, show_summary)
@@ -3882,89 +4515,84 @@ class ZerodhaTradingApp:
                                                               sell_order_type, sell_quantity_type, sell_quantity, sell_price):
         total_buy_orders = len(self.selected_nfo_buy_options)
         total_sell_orders = len(self.selected_nfo_sell_options)
-        buy_orders_placed = 0
-        sell_orders_placed = 0
         self.log_nfo_options_message(f"Starting to place {total_buy_orders} BUY and {total_sell_orders} SELL NFO options orders with real-time prices...")
-        if total_buy_orders > 0:
-            self.log_nfo_options_message("=== PLACING BUY NFO OPTIONS ORDERS ===")
-            for symbol, details in self.selected_nfo_buy_options.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"NFO:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_nfo_options_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
-                            continue
-                    if buy_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = buy_quantity * lot_size
-                    else:
-                        quantity = buy_quantity
-                    final_price = buy_price
-                    if buy_order_type == "LIMIT":
-                        if buy_price == 0:
-                            final_price = current_price * 0.995
-                        self.log_nfo_options_message(f"BUY NFO Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="NFO",
-                        tradingsymbol=symbol,
-                        transaction_type="BUY",
-                        quantity=quantity,
-                        order_type=buy_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if buy_order_type == "LIMIT" else None
-                    )
-                    buy_orders_placed += 1
-                    self.log_nfo_options_message(f"✅ BUY NFO Options Order {buy_orders_placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_nfo_options_message(f"❌ Failed to place BUY NFO options order for {symbol}: {e}")
-        if total_sell_orders > 0:
-            self.log_nfo_options_message("=== PLACING SELL NFO OPTIONS ORDERS ===")
-            for symbol, details in self.selected_nfo_sell_options.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"NFO:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_nfo_options_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
-                            continue
-                    if sell_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = sell_quantity * lot_size
-                    else:
-                        quantity = sell_quantity
-                    final_price = sell_price
-                    if sell_order_type == "LIMIT":
-                        if sell_price == 0:
-                            final_price = current_price * 1.005
-                        self.log_nfo_options_message(f"SELL NFO Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="NFO",
-                        tradingsymbol=symbol,
-                        transaction_type="SELL",
-                        quantity=quantity,
-                        order_type=sell_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if sell_order_type == "LIMIT" else None
-                    )
-                    sell_orders_placed += 1
-                    self.log_nfo_options_message(f"✅ SELL NFO Options Order {sell_orders_placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_nfo_options_message(f"❌ Failed to place SELL NFO options order for {symbol}: {e}")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_nfo_buy_options) + list(self.selected_nfo_sell_options) if not self.current_prices.get(s)], "NFO")
+        def place_buys():
+            placed = 0
+            if total_buy_orders > 0:
+                self.log_nfo_options_message("=== PLACING BUY NFO OPTIONS ORDERS ===")
+                for symbol, details in self.selected_nfo_buy_options.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "NFO")
+                            if current_price is None:
+                                self.log_nfo_options_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
+                                continue
+                        if buy_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = buy_quantity * lot_size
+                        else:
+                            quantity = buy_quantity
+                        final_price = buy_price
+                        if buy_order_type == "LIMIT":
+                            if buy_price == 0:
+                                final_price = current_price * 0.995
+                            self.log_nfo_options_message(f"BUY NFO Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("NFO", symbol, "BUY", quantity, buy_order_type, final_price))
+                        placed += 1
+                        self.log_nfo_options_message(f"✅ BUY NFO Options Order {placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("NFO", symbol, "BUY", quantity, buy_order_type, final_price if buy_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_nfo_options_message)
+                    except Exception as e:
+                        self.log_nfo_options_message(f"❌ Failed to place BUY NFO options order for {symbol}: {e}")
+            return placed
+        def place_sells():
+            placed = 0
+            if total_sell_orders > 0:
+                self.log_nfo_options_message("=== PLACING SELL NFO OPTIONS ORDERS ===")
+                for symbol, details in self.selected_nfo_sell_options.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "NFO")
+                            if current_price is None:
+                                self.log_nfo_options_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
+                                continue
+                        if sell_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = sell_quantity * lot_size
+                        else:
+                            quantity = sell_quantity
+                        final_price = sell_price
+                        if sell_order_type == "LIMIT":
+                            if sell_price == 0:
+                                final_price = current_price * 1.005
+                            self.log_nfo_options_message(f"SELL NFO Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("NFO", symbol, "SELL", quantity, sell_order_type, final_price))
+                        placed += 1
+                        self.log_nfo_options_message(f"✅ SELL NFO Options Order {placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("NFO", symbol, "SELL", quantity, sell_order_type, final_price if sell_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_nfo_options_message)
+                    except Exception as e:
+                        self.log_nfo_options_message(f"❌ Failed to place SELL NFO options order for {symbol}: {e}")
+            return placed
+        # BUY and SELL legs go out concurrently, so the basket takes the longer leg's time, not the sum
+        sells = self.io_executor.submit(place_sells)
+        buy_orders_placed = place_buys()
+        sell_orders_placed = sells.result()
         self.log_nfo_options_message("=== NFO OPTIONS ORDER PLACEMENT SUMMARY ===")
         self.log_nfo_options_message(f"BUY NFO Options Orders: {buy_orders_placed}/{total_buy_orders} successful")
         self.log_nfo_options_message(f"SELL NFO Options Orders: {sell_orders_placed}/{total_sell_orders} successful")
         def show_final_summary():
-            messagebox.showinfo("Buy & Sell NFO Options Orders Completed",
-                f"BUY NFO Options Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL NFO Options Orders: {sell_orders_placed}/{total_sell_orders} successful")
+            summary = f"BUY NFO Options Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL NFO Options Orders: {sell_orders_placed}/{total_sell_orders} successful"
+            if buy_orders_placed == total_buy_orders and sell_orders_placed == total_sell_orders:
+                self.show_toast(summary.replace("\n", " | "))
+            else:
+                messagebox.showwarning("Buy & Sell NFO Options Orders Completed", summary)
         self.root.after(0, show_final_summary)
     
     # NSE order execution
@@ -3972,17 +4600,17 @@ class ZerodhaTradingApp:
         orders_placed = 0
         total_orders = len(self.selected_nse_single_options)
         self.log_nse_options_message(f"Starting to place {total_orders} {transaction} NSE options orders with real-time prices...")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_nse_single_options) if not self.current_prices.get(s)], "NFO")
         for symbol, details in self.selected_nse_single_options.items():
             try:
                 current_price = self.current_prices.get(symbol)
                 if not current_price:
-                    try:
-                        ltp_data = self.kite.ltp(f"NFO:{symbol}")
-                        current_price = list(ltp_data.values())[0]['last_price']
-                        self.log_nse_options_message(f"Fetched current LTP for {symbol}: {current_price}")
-                    except:
+                    current_price = self.get_current_price(symbol, "NFO")
+                    if current_price is None:
                         self.log_nse_options_message(f"❌ Could not fetch LTP for {symbol}, skipping...")
                         continue
+                    self.log_nse_options_message(f"Fetched current LTP for {symbol}: {current_price}")
                 if quantity_type == "Lot Size":
                     lot_size = int(details['lot_size'])
                     quantity = base_quantity * lot_size
@@ -3998,25 +4626,18 @@ class ZerodhaTradingApp:
                     else:
                         final_price = price
                     self.log_nse_options_message(f"Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                order_id = self.kite.place_order(
-                    variety=self.kite.VARIETY_REGULAR,
-                    exchange="NFO",
-                    tradingsymbol=symbol,
-                    transaction_type=transaction,
-                    quantity=quantity,
-                    order_type=order_type,
-                    product=self.kite.PRODUCT_NRML,
-                    price=final_price if order_type == "LIMIT" else None
-                )
+                self._pace_order()
+                order_id = self.kite.place_order(**self._order_params("NFO", symbol, transaction, quantity, order_type, final_price))
                 orders_placed += 1
                 self.log_nse_options_message(f"✅ {transaction} NSE Options Order {orders_placed}/{total_orders}: {symbol} {quantity} @ {final_price if order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                time.sleep(1)
+                self.log_trade("NFO", symbol, transaction, quantity, order_type, final_price if order_type == "LIMIT" else None, order_id)
+                self.watch_order(order_id, symbol, self.log_nse_options_message)
             except Exception as e:
                 self.log_nse_options_message(f"❌ Failed to place {transaction} NSE options order for {symbol}: {e}")
         self.log_nse_options_message(f"{transaction} NSE options order placement completed: {orders_placed}/{total_orders} successful")
         def show_summary():
             if orders_placed == total_orders:
-                messagebox.showinfo("Success", f"All {orders_placed} {transaction} NSE options orders placed successfully!")
+                self.show_toast(f"All {orders_placed} {transaction} NSE options orders placed successfully!")
             else:
                 messagebox.showwarning("Partial Success", f"{orders_placed} out of {total_orders} {transaction} NSE options orders placed successfully")
         self.root.after(0, show_summary)
@@ -4025,112 +4646,129 @@ class ZerodhaTradingApp:
                                                               sell_order_type, sell_quantity_type, sell_quantity, sell_price):
         total_buy_orders = len(self.selected_nse_buy_options)
         total_sell_orders = len(self.selected_nse_sell_options)
-        buy_orders_placed = 0
-        sell_orders_placed = 0
         self.log_nse_options_message(f"Starting to place {total_buy_orders} BUY and {total_sell_orders} SELL NSE options orders with real-time prices...")
-        if total_buy_orders > 0:
-            self.log_nse_options_message("=== PLACING BUY NSE OPTIONS ORDERS ===")
-            for symbol, details in self.selected_nse_buy_options.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"NFO:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_nse_options_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
-                            continue
-                    if buy_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = buy_quantity * lot_size
-                    else:
-                        quantity = buy_quantity
-                    final_price = buy_price
-                    if buy_order_type == "LIMIT":
-                        if buy_price == 0:
-                            final_price = current_price * 0.995
-                        self.log_nse_options_message(f"BUY NSE Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="NFO",
-                        tradingsymbol=symbol,
-                        transaction_type="BUY",
-                        quantity=quantity,
-                        order_type=buy_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if buy_order_type == "LIMIT" else None
-                    )
-                    buy_orders_placed += 1
-                    self.log_nse_options_message(f"✅ BUY NSE Options Order {buy_orders_placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_nse_options_message(f"❌ Failed to place BUY NSE options order for {symbol}: {e}")
-        if total_sell_orders > 0:
-            self.log_nse_options_message("=== PLACING SELL NSE OPTIONS ORDERS ===")
-            for symbol, details in self.selected_nse_sell_options.items():
-                try:
-                    current_price = self.current_prices.get(symbol)
-                    if not current_price:
-                        try:
-                            ltp_data = self.kite.ltp(f"NFO:{symbol}")
-                            current_price = list(ltp_data.values())[0]['last_price']
-                        except:
-                            self.log_nse_options_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
-                            continue
-                    if sell_quantity_type == "Lot Size":
-                        lot_size = int(details['lot_size'])
-                        quantity = sell_quantity * lot_size
-                    else:
-                        quantity = sell_quantity
-                    final_price = sell_price
-                    if sell_order_type == "LIMIT":
-                        if sell_price == 0:
-                            final_price = current_price * 1.005
-                        self.log_nse_options_message(f"SELL NSE Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange="NFO",
-                        tradingsymbol=symbol,
-                        transaction_type="SELL",
-                        quantity=quantity,
-                        order_type=sell_order_type,
-                        product=self.kite.PRODUCT_NRML,
-                        price=final_price if sell_order_type == "LIMIT" else None
-                    )
-                    sell_orders_placed += 1
-                    self.log_nse_options_message(f"✅ SELL NSE Options Order {sell_orders_placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
-                    time.sleep(1)
-                except Exception as e:
-                    self.log_nse_options_message(f"❌ Failed to place SELL NSE options order for {symbol}: {e}")
+        # Fetch any prices the live feed has not delivered yet in one batched call
+        self.get_current_prices([s for s in list(self.selected_nse_buy_options) + list(self.selected_nse_sell_options) if not self.current_prices.get(s)], "NFO")
+        def place_buys():
+            placed = 0
+            if total_buy_orders > 0:
+                self.log_nse_options_message("=== PLACING BUY NSE OPTIONS ORDERS ===")
+                for symbol, details in self.selected_nse_buy_options.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "NFO")
+                            if current_price is None:
+                                self.log_nse_options_message(f"❌ Could not fetch LTP for BUY {symbol}, skipping...")
+                                continue
+                        if buy_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = buy_quantity * lot_size
+                        else:
+                            quantity = buy_quantity
+                        final_price = buy_price
+                        if buy_order_type == "LIMIT":
+                            if buy_price == 0:
+                                final_price = current_price * 0.995
+                            self.log_nse_options_message(f"BUY NSE Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("NFO", symbol, "BUY", quantity, buy_order_type, final_price))
+                        placed += 1
+                        self.log_nse_options_message(f"✅ BUY NSE Options Order {placed}/{total_buy_orders}: {symbol} {quantity} @ {final_price if buy_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("NFO", symbol, "BUY", quantity, buy_order_type, final_price if buy_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_nse_options_message)
+                    except Exception as e:
+                        self.log_nse_options_message(f"❌ Failed to place BUY NSE options order for {symbol}: {e}")
+            return placed
+        def place_sells():
+            placed = 0
+            if total_sell_orders > 0:
+                self.log_nse_options_message("=== PLACING SELL NSE OPTIONS ORDERS ===")
+                for symbol, details in self.selected_nse_sell_options.items():
+                    try:
+                        current_price = self.current_prices.get(symbol)
+                        if not current_price:
+                            current_price = self.get_current_price(symbol, "NFO")
+                            if current_price is None:
+                                self.log_nse_options_message(f"❌ Could not fetch LTP for SELL {symbol}, skipping...")
+                                continue
+                        if sell_quantity_type == "Lot Size":
+                            lot_size = int(details['lot_size'])
+                            quantity = sell_quantity * lot_size
+                        else:
+                            quantity = sell_quantity
+                        final_price = sell_price
+                        if sell_order_type == "LIMIT":
+                            if sell_price == 0:
+                                final_price = current_price * 1.005
+                            self.log_nse_options_message(f"SELL NSE Options Limit order for {symbol}: Using price {final_price:.2f} (Current LTP: {current_price:.2f})")
+                        self._pace_order()
+                        order_id = self.kite.place_order(**self._order_params("NFO", symbol, "SELL", quantity, sell_order_type, final_price))
+                        placed += 1
+                        self.log_nse_options_message(f"✅ SELL NSE Options Order {placed}/{total_sell_orders}: {symbol} {quantity} @ {final_price if sell_order_type == 'LIMIT' else 'MARKET'} - ID: {order_id}")
+                        self.log_trade("NFO", symbol, "SELL", quantity, sell_order_type, final_price if sell_order_type == "LIMIT" else None, order_id)
+                        self.watch_order(order_id, symbol, self.log_nse_options_message)
+                    except Exception as e:
+                        self.log_nse_options_message(f"❌ Failed to place SELL NSE options order for {symbol}: {e}")
+            return placed
+        # BUY and SELL legs go out concurrently, so the basket takes the longer leg's time, not the sum
+        sells = self.io_executor.submit(place_sells)
+        buy_orders_placed = place_buys()
+        sell_orders_placed = sells.result()
         self.log_nse_options_message("=== NSE OPTIONS ORDER PLACEMENT SUMMARY ===")
         self.log_nse_options_message(f"BUY NSE Options Orders: {buy_orders_placed}/{total_buy_orders} successful")
         self.log_nse_options_message(f"SELL NSE Options Orders: {sell_orders_placed}/{total_sell_orders} successful")
         def show_final_summary():
-            messagebox.showinfo("Buy & Sell NSE Options Orders Completed",
-                f"BUY NSE Options Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL NSE Options Orders: {sell_orders_placed}/{total_sell_orders} successful")
+            summary = f"BUY NSE Options Orders: {buy_orders_placed}/{total_buy_orders} successful\nSELL NSE Options Orders: {sell_orders_placed}/{total_sell_orders} successful"
+            if buy_orders_placed == total_buy_orders and sell_orders_placed == total_sell_orders:
+                self.show_toast(summary.replace("\n", " | "))
+            else:
+                messagebox.showwarning("Buy & Sell NSE Options Orders Completed", summary)
         self.root.after(0, show_final_summary)
     
     # ---------- Data Refresh Methods ----------
+    def schedule_table_refresh(self, refresh, delay=120):
+        """Debounce a table rebuild so only the last of a burst of selections runs it"""
+        job = self.refresh_jobs.pop(refresh.__name__, None)
+        if job is not None:
+            self.root.after_cancel(job)
+        def run():
+            self.refresh_jobs.pop(refresh.__name__, None)
+            refresh()
+        self.refresh_jobs[refresh.__name__] = self.root.after(delay, run)
+    
+    def _run_in_background(self, work, on_done, log_func, error_prefix, on_error=None):
+        """Run work on the I/O pool and hand its result to on_done (or its error to on_error) on the Tk thread"""
+        def finish(callback, value):
+            try:
+                callback(value)
+            except Exception as e:
+                log_func(f"{error_prefix}: {e}")
+        def done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                log_func(f"{error_prefix}: {e}")
+                if on_error is not None:
+                    self.root.after(0, lambda err=e: finish(on_error, err))
+                return
+            self.root.after(0, lambda: finish(on_done, result))
+        self.io_executor.submit(work).add_done_callback(done)
+    
     def refresh_futures_table(self):
         if not self.is_logged_in:
             messagebox.showerror("Error", "Please login first")
             return
-        try:
-            futures = self.get_all_futures()
-            for item in self.futures_tree.get_children():
-                self.futures_tree.delete(item)
-            for future in futures:
-                self.futures_tree.insert('', 'end', values=(
-                    future['tradingsymbol'],
-                    future['name'],
-                    future['expiry'],
-                    future['lot_size'],
-                    'Loading...', 'Loading...', 'Loading...'))
+        def apply(futures):
+            self._fill_live_table(self.futures_tree, "MCX", [
+                (future['tradingsymbol'], future['name'], future['expiry'], future['lot_size'])
+                for future in futures])
             self.log_futures_message(f"Loaded {len(futures)} futures contracts")
             if not self.futures_data_running:
                 self.start_futures_live_data()
-        except Exception as e:
-            self.log_futures_message(f"Error refreshing futures table: {e}")
+        # Instrument filtering runs on the I/O pool so the Tk thread only touches the tree
+        self._run_in_background(self.get_all_futures, apply, self.log_futures_message,
+                                "Error refreshing futures table")
     
     def refresh_options_table(self):
         if not self.is_logged_in:
@@ -4140,30 +4778,28 @@ class ZerodhaTradingApp:
             underlying = self.options_underlying_var.get()
             min_strike = float(self.options_min_strike_entry.get()) if self.options_min_strike_entry.get() else 0
             max_strike = float(self.options_max_strike_entry.get()) if self.options_max_strike_entry.get() else 0
-            # Update month combobox
+        except ValueError as e:
+            self.log_options_message(f"Error refreshing MCX options table: {e}")
+            return
+        month = self.options_month_var.get()
+        def load():
             months = self.get_unique_expiry_months("MCX", underlying)
+            selected_month = month or (months[0] if months else '')
+            return months, selected_month, self.get_all_options(underlying, min_strike, max_strike, selected_month)
+        def apply(result):
+            months, selected_month, options = result
             self.options_month_combo['values'] = months
             if months and not self.options_month_var.get():
-                self.options_month_var.set(months[0])
-            selected_month = self.options_month_var.get()
-            options = self.get_all_options(underlying, min_strike, max_strike, selected_month)
-            for item in self.options_tree.get_children():
-                self.options_tree.delete(item)
-            for option in options:
-                self.options_tree.insert('', 'end', values=(
-                    option['tradingsymbol'],
-                    option['name'],
-                    option['expiry'],
-                    option['strike'],
-                    option['instrument_type'],
-                    option['lot_size'],
-                    'Loading...', 'Loading...', 'Loading...'))
+                self.options_month_var.set(selected_month)
+            self._fill_live_table(self.options_tree, "MCX", [
+                (option['tradingsymbol'], option['name'], option['expiry'],
+                 option['strike'], option['instrument_type'], option['lot_size'])
+                for option in options])
             self.log_options_message(f"Loaded {len(options)} MCX options contracts for {underlying} (strike {min_strike}-{max_strike}, month {selected_month})")
             if not self.options_data_running:
                 self.start_options_live_data()
-        except Exception as e:
-            self.log_options_message(f"Error refreshing MCX options table: {e}")
-
+        self._run_in_background(load, apply, self.log_options_message, "Error refreshing MCX options table")
+    
     def refresh_nfo_options_table(self):
         if not self.is_logged_in:
             messagebox.showerror("Error", "Please login first")
@@ -4172,119 +4808,57 @@ class ZerodhaTradingApp:
             underlying = self.nfo_options_underlying_var.get()
             min_strike = float(self.nfo_min_strike_entry.get()) if self.nfo_min_strike_entry.get() else 0
             max_strike = float(self.nfo_max_strike_entry.get()) if self.nfo_max_strike_entry.get() else 0
+        except ValueError as e:
+            self.log_nfo_options_message(f"Error refreshing NFO options table: {e}")
+            return
+        month = self.nfo_options_month_var.get()
+        def load():
             months = self.get_unique_expiry_months("NFO", underlying)
+            selected_month = month or (months[0] if months else '')
+            return months, selected_month, self.get_all_nfo_options(underlying, min_strike, max_strike, selected_month)
+        def apply(result):
+            months, selected_month, options = result
             self.nfo_options_month_combo['values'] = months
             if months and not self.nfo_options_month_var.get():
-                self.nfo_options_month_var.set(months[0])
-            selected_month = self.nfo_options_month_var.get()
-            options = self.get_all_nfo_options(underlying, min_strike, max_strike, selected_month)
-            for item in self.nfo_options_tree.get_children():
-                self.nfo_options_tree.delete(item)
-            for option in options:
-                self.nfo_options_tree.insert('', 'end', values=(
-                    option['tradingsymbol'],
-                    option['name'],
-                    option['expiry'],
-                    option['strike'],
-                    option['instrument_type'],
-                    option['lot_size'],
-                    'Loading...', 'Loading...', 'Loading...'))
+                self.nfo_options_month_var.set(selected_month)
+            self._fill_live_table(self.nfo_options_tree, "NFO", [
+                (option['tradingsymbol'], option['name'], option['expiry'],
+                 option['strike'], option['instrument_type'], option['lot_size'])
+                for option in options])
             self.log_nfo_options_message(f"Loaded {len(options)} NFO options contracts for {underlying} (strike {min_strike}-{max_strike}, month {selected_month})")
             if not self.nfo_options_data_running:
                 self.start_nfo_options_live_data()
-        except Exception as e:
-            self.log_nfo_options_message(f"Error refreshing NFO options table: {e}")
-
+        self._run_in_background(load, apply, self.log_nfo_options_message, "Error refreshing NFO options table")
+    
     def refresh_nse_options_table(self):
         if not self.is_logged_in:
             messagebox.showerror("Error", "Please login first")
             return
         try:
-            stock_symbol = self.nse_options_underlying_var.get()
+            underlying = self.nse_options_underlying_var.get()
             min_strike = float(self.nse_min_strike_entry.get()) if self.nse_min_strike_entry.get() else 0
             max_strike = float(self.nse_max_strike_entry.get()) if self.nse_max_strike_entry.get() else 0
-            months = self.get_unique_expiry_months("NSE", stock_symbol)
-            self.nse_options_month_combo['values'] = months
-            if months and not self.nse_options_month_var.get():
-                self.nse_options_month_var.set(months[0])
-            selected_month = self.nse_options_month_var.get()
-            options = self.get_all_nse_stock_options(stock_symbol, min_strike, max_strike, selected_month)
-            for item in self.nse_options_tree.get_children():
-                self.nse_options_tree.delete(item)
-            for option in options:
-                self.nse_options_tree.insert('', 'end', values=(
-                    option['tradingsymbol'],
-                    option['name'],
-                    option['expiry'],
-                    option['strike'],
-                    option['instrument_type'],
-                    option['lot_size'],
-                    'Loading...', 'Loading...', 'Loading...'))
-            self.log_nse_options_message(f"Loaded {len(options)} NSE options contracts for {stock_symbol} (strike {min_strike}-{max_strike}, month {selected_month})")
-            if not self.nse_options_data_running:
-                self.start_nse_options_live_data()
-        except Exception as e:
+        except ValueError as e:
             self.log_nse_options_message(f"Error refreshing NSE options table: {e}")
-    
-    def refresh_nfo_options_table(self):
-        if not self.is_logged_in:
-            messagebox.showerror("Error", "Please login first")
-            return
-        try:
-            underlying = self.nfo_options_underlying_var.get()
-            strike_range = self.nfo_strike_range_var.get()
-            months = self.get_unique_expiry_months("NFO", underlying)
-            self.nfo_options_month_combo['values'] = months
-            if months and not self.nfo_options_month_var.get():
-                self.nfo_options_month_var.set(months[0])
-            selected_month = self.nfo_options_month_var.get()
-            options = self.get_all_nfo_options(underlying, strike_range, selected_month)
-            for item in self.nfo_options_tree.get_children():
-                self.nfo_options_tree.delete(item)
-            for option in options:
-                self.nfo_options_tree.insert('', 'end', values=(
-                    option['tradingsymbol'],
-                    option['name'],
-                    option['expiry'],
-                    option['strike'],
-                    option['instrument_type'],
-                    option['lot_size'],
-                    'Loading...', 'Loading...', 'Loading...'))
-            self.log_nfo_options_message(f"Loaded {len(options)} NFO options contracts for {underlying} (strike ±{strike_range}, month {selected_month})")
-            if not self.nfo_options_data_running:
-                self.start_nfo_options_live_data()
-        except Exception as e:
-            self.log_nfo_options_message(f"Error refreshing NFO options table: {e}")
-    
-    def refresh_nse_options_table(self):
-        if not self.is_logged_in:
-            messagebox.showerror("Error", "Please login first")
             return
-        try:
-            stock_symbol = self.nse_options_underlying_var.get()
-            strike_range = self.nse_strike_range_var.get()
-            months = self.get_unique_expiry_months("NSE", stock_symbol)
+        month = self.nse_options_month_var.get()
+        def load():
+            months = self.get_unique_expiry_months("NSE", underlying)
+            selected_month = month or (months[0] if months else '')
+            return months, selected_month, self.get_all_nse_stock_options(underlying, min_strike, max_strike, selected_month)
+        def apply(result):
+            months, selected_month, options = result
             self.nse_options_month_combo['values'] = months
             if months and not self.nse_options_month_var.get():
-                self.nse_options_month_var.set(months[0])
-            selected_month = self.nse_options_month_var.get()
-            options = self.get_all_nse_stock_options(stock_symbol, strike_range, selected_month)
-            for item in self.nse_options_tree.get_children():
-                self.nse_options_tree.delete(item)
-            for option in options:
-                self.nse_options_tree.insert('', 'end', values=(
-                    option['tradingsymbol'],
-                    option['name'],
-                    option['expiry'],
-                    option['strike'],
-                    option['instrument_type'],
-                    option['lot_size'],
-                    'Loading...', 'Loading...', 'Loading...'))
-            self.log_nse_options_message(f"Loaded {len(options)} NSE options contracts for {stock_symbol} (strike ±{strike_range}, month {selected_month})")
+                self.nse_options_month_var.set(selected_month)
+            self._fill_live_table(self.nse_options_tree, "NFO", [
+                (option['tradingsymbol'], option['name'], option['expiry'],
+                 option['strike'], option['instrument_type'], option['lot_size'])
+                for option in options])
+            self.log_nse_options_message(f"Loaded {len(options)} NSE options contracts for {underlying} (strike {min_strike}-{max_strike}, month {selected_month})")
             if not self.nse_options_data_running:
                 self.start_nse_options_live_data()
-        except Exception as e:
-            self.log_nse_options_message(f"Error refreshing NSE options table: {e}")
+        self._run_in_background(load, apply, self.log_nse_options_message, "Error refreshing NSE options table")
     
     def start_futures_live_data(self):
         if not self.is_logged_in:
@@ -4330,160 +4904,252 @@ class ZerodhaTradingApp:
         self.nse_options_data_running = False
         self.log_nse_options_message("Stopped live prices for NSE options table")
     
+    def _configure_change_tags(self, tree):
+        """Row colours for a live table, set once so quote updates only swap the row's tag"""
+        tree.tag_configure('up', foreground='green')
+        tree.tag_configure('down', foreground='red')
+    
+    def _queue_tree_update(self, tree, item, cells, tags=None):
+        """Stage changed cells from a live-data thread; one after_idle pass applies the batch"""
+        with self.tree_update_lock:
+            # Last write wins per cell, so a row that ticked twice before the flush is redrawn once
+            self.pending_tree_updates.setdefault((tree, item), {}).update(cells)
+            if tags is not None:
+                self.pending_tree_tags[(tree, item)] = tags
+            if self.tree_flush_scheduled:
+                return
+            self.tree_flush_scheduled = True
+        self.root.after_idle(self._flush_tree_updates)
+    
+    def _flush_tree_updates(self):
+        """Apply every staged cell update on the Tk thread"""
+        with self.tree_update_lock:
+            batch = self.pending_tree_updates
+            tag_batch = self.pending_tree_tags
+            self.pending_tree_updates = {}
+            self.pending_tree_tags = {}
+            self.tree_flush_scheduled = False
+        for (tree, item), cells in batch.items():
+            if tree.exists(item):
+                for column, value in cells.items():
+                    tree.set(item, column, value)
+        for (tree, item), tags in tag_batch.items():
+            if tree.exists(item):
+                tree.item(item, tags=tags)
+    
+    def live_table_visible(self, tree):
+        """True when tree sits on the notebook tab the user is looking at"""
+        return bool(self.visible_tab) and str(tree).startswith(self.visible_tab + '.')
+    
+    def _live_table_store(self, tree):
+        """Row index plus NumPy LTP/change%/volume columns for a live table"""
+        # _fill_live_table is the only writer of a live table's rows and swaps in a new store in
+        # the same Tk pass, so the loops read the store without calling into Tk from their threads
+        store = self.live_table_stores.get(tree)
+        if store is None:
+            store = self._new_live_store((), [])
+        return store
+    
+    def _new_live_store(self, items, keys):
+        """Quote columns for a table's rows, indexed by EXCHANGE:SYMBOL key"""
+        # LTP in paise and change % in hundredths are int32, quantized to what the table shows,
+        # so change detection is an exact integer compare. The sentinels never equal a real
+        # quote, so every row's first tick is drawn.
+        return {
+            'items': items,
+            'rows': {key: row for row, key in enumerate(keys)},
+            'ltp': np.full(len(items), QUOTE_UNSET, dtype=np.int32),
+            'change_pct': np.full(len(items), QUOTE_UNSET, dtype=np.int32),
+            'volume': np.full(len(items), -1, dtype=np.int64),
+            # Sign of change % behind the row's up/down tag; 2 forces the first tag write
+            'direction': np.full(len(items), 2, dtype=np.int8),
+        }
+    
+    def _fill_live_table(self, tree, exchange, rows):
+        """Replace a live table's rows and preallocate its quote store in the same Tk pass"""
+        keys = [f"{exchange}:{values[0]}" for values in rows]
+        store = self.live_table_stores.get(tree)
+        # A refresh that lists the same contracts keeps the rows and their quotes instead of
+        # flashing the table back to Loading...
+        if store is not None and list(store['rows']) == keys and store['items'] == tree.get_children():
+            return
+        tree.delete(*tree.get_children())
+        items = tuple(tree.insert('', 'end', values=values + ('Loading...', 'Loading...', 'Loading...'))
+                      for values in rows)
+        self.live_table_stores[tree] = self._new_live_store(items, keys)
+    
+    def _apply_live_quotes(self, store, tree, ltp_data):
+        """Write one kite.ltp batch into the table's quote columns and queue only the cells that changed"""
+        rows = store['rows']
+        # One pass over the response pulls every field into a flat tuple per row
+        hits = [(rows[key], data['last_price'], data.get('net_change', 0), data.get('volume', 0))
+                for key, data in ltp_data.items() if key in rows]
+        if not hits:
+            return
+        columns = np.array(hits, dtype=np.float64)
+        idx = columns[:, 0].astype(np.intp)
+        ltp = columns[:, 1]
+        change = columns[:, 2]
+        volume = columns[:, 3].astype(np.int64)
+        # Change % for the whole batch in one vectorised pass, then both quantized to display precision
+        change_pct = np.rint(_change_percent(ltp, change) * 100).astype(np.int32)
+        ltp = np.rint(ltp * 100).astype(np.int32)
+        ltp_changed = store['ltp'][idx] != ltp
+        pct_changed = store['change_pct'][idx] != change_pct
+        volume_changed = store['volume'][idx] != volume
+        store['ltp'][idx] = ltp
+        store['change_pct'][idx] = change_pct
+        store['volume'][idx] = volume
+        direction = np.sign(change_pct).astype(np.int8)
+        direction_changed = store['direction'][idx] != direction
+        store['direction'][idx] = direction
+        for k in np.flatnonzero(ltp_changed | pct_changed | volume_changed):
+            cells = {}
+            if ltp_changed[k]:
+                cells['LTP'] = f"{ltp[k] / 100:.2f}"
+            if pct_changed[k]:
+                cells['Change'] = f"{change_pct[k] / 100:+.2f}%"
+            if volume_changed[k]:
+                cells['Volume'] = f"{volume[k]:,}"
+            # The row is retagged only when its change % crosses zero
+            tags = CHANGE_TAGS[int(direction[k])] if direction_changed[k] else None
+            self._queue_tree_update(tree, store['items'][idx[k]], cells, tags)
+    
     def update_futures_live_data(self):
+        backoff = 10
         while self.futures_data_running and self.is_logged_in:
             try:
-                symbols = []
-                for item in self.futures_tree.get_children():
-                    values = self.futures_tree.item(item, 'values')
-                    if values and len(values) > 0:
-                        symbols.append(values[0])
-                if not symbols:
+                if not self.live_table_visible(self.futures_tree):
+                    time.sleep(1)
+                    continue
+                # Row index and quote columns as _fill_live_table last built them on the Tk thread
+                store = self._live_table_store(self.futures_tree)
+                rows = store['rows']
+                if not rows:
                     time.sleep(5)
                     continue
-                instruments = [f"MCX:{symbol}" for symbol in symbols]
+                instruments = list(rows)
                 batch_size = 50
-                for i in range(0, len(instruments), batch_size):
+                batches = range(0, len(instruments), batch_size)
+                failed = 0
+                for i in batches:
                     batch = instruments[i:i + batch_size]
                     try:
                         ltp_data = self.kite.ltp(batch)
-                        for instrument_key, data in ltp_data.items():
-                            symbol = instrument_key.replace("MCX:", "")
-                            for item in self.futures_tree.get_children():
-                                item_values = self.futures_tree.item(item, 'values')
-                                if item_values and len(item_values) > 0 and item_values[0] == symbol:
-                                    ltp = data['last_price']
-                                    change = data.get('net_change', 0)
-                                    change_percent = (change / (ltp - change)) * 100 if (ltp - change) != 0 else 0
-                                    volume = data.get('volume', 0)
-                                    new_values = (
-                                        item_values[0], item_values[1], item_values[2], item_values[3],
-                                        f"{ltp:.2f}", f"{change_percent:+.2f}%", f"{volume:,}")
-                                    self.futures_tree.item(item, values=new_values)
-                                    break
+                        self._apply_live_quotes(store, self.futures_tree, ltp_data)
                     except Exception as e:
+                        failed += 1
                         self.log_futures_message(f"Error updating futures batch {i//batch_size + 1}: {e}")
+                if failed == len(batches):
+                    # Nothing got through: back off like any other outage instead of retrying in 3s
+                    raise RuntimeError(f"all {failed} LTP batches failed")
+                backoff = 10
                 time.sleep(3)
             except Exception as e:
                 self.log_futures_message(f"Error in futures live data update: {e}")
-                time.sleep(10)
+                backoff = _backoff_sleep(backoff)
     
     def update_options_live_data(self):
+        backoff = 10
         while self.options_data_running and self.is_logged_in:
             try:
-                symbols = []
-                for item in self.options_tree.get_children():
-                    values = self.options_tree.item(item, 'values')
-                    if values and len(values) > 0:
-                        symbols.append(values[0])
-                if not symbols:
+                if not self.live_table_visible(self.options_tree):
+                    time.sleep(1)
+                    continue
+                # Row index and quote columns as _fill_live_table last built them on the Tk thread
+                store = self._live_table_store(self.options_tree)
+                rows = store['rows']
+                if not rows:
                     time.sleep(5)
                     continue
-                instruments = [f"MCX:{symbol}" for symbol in symbols]
+                instruments = list(rows)
                 batch_size = 50
-                for i in range(0, len(instruments), batch_size):
+                batches = range(0, len(instruments), batch_size)
+                failed = 0
+                for i in batches:
                     batch = instruments[i:i + batch_size]
                     try:
                         ltp_data = self.kite.ltp(batch)
-                        for instrument_key, data in ltp_data.items():
-                            symbol = instrument_key.replace("MCX:", "")
-                            for item in self.options_tree.get_children():
-                                item_values = self.options_tree.item(item, 'values')
-                                if item_values and len(item_values) > 0 and item_values[0] == symbol:
-                                    ltp = data['last_price']
-                                    change = data.get('net_change', 0)
-                                    change_percent = (change / (ltp - change)) * 100 if (ltp - change) != 0 else 0
-                                    volume = data.get('volume', 0)
-                                    new_values = (
-                                        item_values[0], item_values[1], item_values[2], item_values[3],
-                                        item_values[4], item_values[5],
-                                        f"{ltp:.2f}", f"{change_percent:+.2f}%", f"{volume:,}")
-                                    self.options_tree.item(item, values=new_values)
-                                    break
+                        self._apply_live_quotes(store, self.options_tree, ltp_data)
                     except Exception as e:
+                        failed += 1
                         self.log_options_message(f"Error updating MCX options batch {i//batch_size + 1}: {e}")
+                if failed == len(batches):
+                    # Nothing got through: back off like any other outage instead of retrying in 3s
+                    raise RuntimeError(f"all {failed} LTP batches failed")
+                backoff = 10
                 time.sleep(3)
             except Exception as e:
                 self.log_options_message(f"Error in MCX options live data update: {e}")
-                time.sleep(10)
+                backoff = _backoff_sleep(backoff)
     
     def update_nfo_options_live_data(self):
+        backoff = 10
         while self.nfo_options_data_running and self.is_logged_in:
             try:
-                symbols = []
-                for item in self.nfo_options_tree.get_children():
-                    values = self.nfo_options_tree.item(item, 'values')
-                    if values and len(values) > 0:
-                        symbols.append(values[0])
-                if not symbols:
+                if not self.live_table_visible(self.nfo_options_tree):
+                    time.sleep(1)
+                    continue
+                # Row index and quote columns as _fill_live_table last built them on the Tk thread
+                store = self._live_table_store(self.nfo_options_tree)
+                rows = store['rows']
+                if not rows:
                     time.sleep(5)
                     continue
-                instruments = [f"NFO:{symbol}" for symbol in symbols]
+                instruments = list(rows)
                 batch_size = 50
-                for i in range(0, len(instruments), batch_size):
+                batches = range(0, len(instruments), batch_size)
+                failed = 0
+                for i in batches:
                     batch = instruments[i:i + batch_size]
                     try:
                         ltp_data = self.kite.ltp(batch)
-                        for instrument_key, data in ltp_data.items():
-                            symbol = instrument_key.replace("NFO:", "")
-                            for item in self.nfo_options_tree.get_children():
-                                item_values = self.nfo_options_tree.item(item, 'values')
-                                if item_values and len(item_values) > 0 and item_values[0] == symbol:
-                                    ltp = data['last_price']
-                                    change = data.get('net_change', 0)
-                                    change_percent = (change / (ltp - change)) * 100 if (ltp - change) != 0 else 0
-                                    volume = data.get('volume', 0)
-                                    new_values = (
-                                        item_values[0], item_values[1], item_values[2], item_values[3],
-                                        item_values[4], item_values[5],
-                                        f"{ltp:.2f}", f"{change_percent:+.2f}%", f"{volume:,}")
-                                    self.nfo_options_tree.item(item, values=new_values)
-                                    break
+                        self._apply_live_quotes(store, self.nfo_options_tree, ltp_data)
                     except Exception as e:
+                        failed += 1
                         self.log_nfo_options_message(f"Error updating NFO options batch {i//batch_size + 1}: {e}")
+                if failed == len(batches):
+                    # Nothing got through: back off like any other outage instead of retrying in 3s
+                    raise RuntimeError(f"all {failed} LTP batches failed")
+                backoff = 10
                 time.sleep(3)
             except Exception as e:
                 self.log_nfo_options_message(f"Error in NFO options live data update: {e}")
-                time.sleep(10)
+                backoff = _backoff_sleep(backoff)
     
     def update_nse_options_live_data(self):
+        backoff = 10
         while self.nse_options_data_running and self.is_logged_in:
             try:
-                symbols = []
-                for item in self.nse_options_tree.get_children():
-                    values = self.nse_options_tree.item(item, 'values')
-                    if values and len(values) > 0:
-                        symbols.append(values[0])
-                if not symbols:
+                if not self.live_table_visible(self.nse_options_tree):
+                    time.sleep(1)
+                    continue
+                # Row index and quote columns as _fill_live_table last built them on the Tk thread
+                store = self._live_table_store(self.nse_options_tree)
+                rows = store['rows']
+                if not rows:
                     time.sleep(5)
                     continue
-                instruments = [f"NFO:{symbol}" for symbol in symbols]
+                instruments = list(rows)
                 batch_size = 50
-                for i in range(0, len(instruments), batch_size):
+                batches = range(0, len(instruments), batch_size)
+                failed = 0
+                for i in batches:
                     batch = instruments[i:i + batch_size]
                     try:
                         ltp_data = self.kite.ltp(batch)
-                        for instrument_key, data in ltp_data.items():
-                            symbol = instrument_key.replace("NFO:", "")
-                            for item in self.nse_options_tree.get_children():
-                                item_values = self.nse_options_tree.item(item, 'values')
-                                if item_values and len(item_values) > 0 and item_values[0] == symbol:
-                                    ltp = data['last_price']
-                                    change = data.get('net_change', 0)
-                                    change_percent = (change / (ltp - change)) * 100 if (ltp - change) != 0 else 0
-                                    volume = data.get('volume', 0)
-                                    new_values = (
-                                        item_values[0], item_values[1], item_values[2], item_values[3],
-                                        item_values[4], item_values[5],
-                                        f"{ltp:.2f}", f"{change_percent:+.2f}%", f"{volume:,}")
-                                    self.nse_options_tree.item(item, values=new_values)
-                                    break
+                        self._apply_live_quotes(store, self.nse_options_tree, ltp_data)
                     except Exception as e:
+                        failed += 1
                         self.log_nse_options_message(f"Error updating NSE options batch {i//batch_size + 1}: {e}")
+                if failed == len(batches):
+                    # Nothing got through: back off like any other outage instead of retrying in 3s
+                    raise RuntimeError(f"all {failed} LTP batches failed")
+                backoff = 10
                 time.sleep(3)
             except Exception as e:
                 self.log_nse_options_message(f"Error in NSE options live data update: {e}")
-                time.sleep(10)
+                backoff = _backoff_sleep(backoff)
     
     # ---------- Positions and P&L ----------
     def setup_positions_tab(self, notebook):
@@ -4496,7 +5162,7 @@ class ZerodhaTradingApp:
             self.positions_tree.heading(col, text=col)
             self.positions_tree.column(col, width=120)
         self.positions_tree.pack(fill='both', expand=True, padx=10, pady=10)
-        ttk.Button(positions_frame, text="Refresh Positions", command=self.refresh_positions).pack(pady=10)
+        ttk.Button(positions_frame, text="Refresh Positions", command=self.request_positions_refresh).pack(pady=10)
     
     def setup_pnl_tab(self, notebook):
         pnl_frame = ttk.Frame(notebook)
@@ -4518,7 +5184,8 @@ class ZerodhaTradingApp:
         self.profit_target_entry.pack(side='left', padx=5)
         self.profit_target_entry.insert(0, "1000")
         ttk.Button(profit_target_frame, text="Set Target", command=self.set_profit_target).pack(side='left', padx=5)
-        ttk.Button(profit_target_frame, text="Auto Exit All", command=self.auto_exit_positions).pack(side='left', padx=5)
+        ttk.Button(profit_target_frame, text="Auto Exit All",
+                   command=lambda: self._start_order_batch(self._exit_all_positions, ())).pack(side='left', padx=5)
         
         trailing_frame = ttk.LabelFrame(summary_frame, text="Trailing Profit")
         trailing_frame.pack(fill='x', pady=5)
@@ -4564,60 +5231,138 @@ class ZerodhaTradingApp:
         return True
     
     def start_background_tasks(self):
+        self.start_ticker()
         threading.Thread(target=self.update_positions_loop, daemon=True).start()
         threading.Thread(target=self.update_pnl_loop, daemon=True).start()
-        threading.Thread(target=self.monitor_profit_target, daemon=True).start()
         if self.is_logged_in:
-            self.root.after(2000, self.refresh_futures_table)
-            self.root.after(3000, self.refresh_options_table)
-            self.root.after(4000, self.refresh_nfo_options_table)
-            self.root.after(5000, self.refresh_nse_options_table)
+            # Instruments are loaded before this runs; the four refreshes filter in parallel on the I/O pool
+            self.refresh_futures_table()
+            self.refresh_options_table()
+            self.refresh_nfo_options_table()
+            self.refresh_nse_options_table()
     
     def update_positions_loop(self):
+        backoff = 30
         while self.is_logged_in:
             try:
-                self.refresh_positions()
-                time.sleep(5)
+                # refresh_positions logs its own errors; a failed fetch only tells the loop to back off
+                if not self.refresh_positions():
+                    backoff = _backoff_sleep(backoff)
+                    continue
+                backoff = 30
+                # Fills push a refresh through on_order_update, so the poll only backstops a dropped ticker
+                time.sleep(15 if self.ticker_connected else 5)
             except Exception as e:
                 self.log_message(f"Error updating positions: {e}")
-                time.sleep(30)
+                backoff = _backoff_sleep(backoff)
     
     def refresh_positions(self):
+        """Patch the positions table from the shared snapshot; False when the fetch failed"""
         if not self.is_logged_in:
-            return
+            return False
         try:
-            positions = self.kite.positions()
+            positions = self.fetch_positions()
+            # Rows are keyed by exchange:tradingsymbol:product so each refresh patches them in place;
+            # MIS and NRML positions in one contract are separate net rows and keep separate entries.
+            # Prices are formatted to paise here, so float noise below that never counts as a change.
+            rows = {
+                f"{position['exchange']}:{position['tradingsymbol']}:{position['product']}": (
+                    position['tradingsymbol'],
+                    position['quantity'],
+                    '%.2f' % position['average_price'],
+                    '%.2f' % position['last_price'],
+                    '%.2f' % position['pnl'],
+                    '%.2f' % position.get('day_pnl', 0))
+                for position in positions['net'] if position['quantity'] != 0
+            }
             def update_gui():
-                for item in self.positions_tree.get_children():
-                    self.positions_tree.delete(item)
-                for position in positions['net']:
-                    if position['quantity'] != 0:
-                        self.positions_tree.insert('', 'end', values=(
-                            position['tradingsymbol'],
-                            position['quantity'],
-                            position['average_price'],
-                            position['last_price'],
-                            position['pnl'],
-                            position.get('day_pnl', 0)))
+                tree = self.positions_tree
+                stale = [iid for iid in tree.get_children() if iid not in rows]
+                if stale:
+                    tree.delete(*stale)
+                for iid, values in rows.items():
+                    if not tree.exists(iid):
+                        tree.insert('', 'end', iid=iid, values=values)
+                    elif self.positions_rows.get(iid) != values:
+                        tree.item(iid, values=values)
+                self.positions_rows = rows
             self.root.after(0, update_gui)
+            return True
+        except TokenException as e:
+            self.invalidate_session(e)
         except Exception as e:
             self.log_message(f"Error refreshing positions: {e}")
+        return False
+    
+    def fetch_positions(self):
+        """kite.positions(), reused for POSITIONS_TTL seconds; concurrent callers share one request"""
+        with self.positions_lock:
+            if self.positions_snapshot is not None and time.monotonic() - self.positions_fetched_at < POSITIONS_TTL:
+                return self.positions_snapshot
+            future = self.positions_future
+            fetching = future is None
+            if fetching:
+                future = self.positions_future = Future()
+                generation = self.positions_generation
+        if not fetching:
+            return future.result()
+        try:
+            positions = self.kite.positions()
+        except Exception as e:
+            with self.positions_lock:
+                if self.positions_future is future:
+                    self.positions_future = None
+            future.set_exception(e)
+            raise
+        with self.positions_lock:
+            if self.positions_future is future:
+                self.positions_future = None
+            # A postback during the request may mean this response predates a fill
+            if generation == self.positions_generation:
+                self.positions_snapshot = positions
+                self.positions_fetched_at = time.monotonic()
+        future.set_result(positions)
+        return positions
+    
+    def invalidate_positions(self):
+        """Expire the shared positions snapshot and detach any request already in flight"""
+        with self.positions_lock:
+            self.positions_generation += 1
+            self.positions_fetched_at = 0.0
+            # Callers arriving after the postback start a fresh request instead of joining this one
+            self.positions_future = None
+    
+    def request_positions_refresh(self):
+        """Refresh positions on the I/O pool; requests arriving while one is queued share it"""
+        if self.positions_refresh_pending:
+            return
+        self.positions_refresh_pending = True
+        def run():
+            self.positions_refresh_pending = False
+            self.refresh_positions()
+        # Fills of one batch arrive as a burst of postbacks; the short delay lets them share one fetch
+        self.root.after(POSITIONS_REFRESH_DELAY, lambda: self.io_executor.submit(run))
     
     def update_pnl_loop(self):
+        backoff = 30
         while self.is_logged_in:
             try:
-                self.update_pnl()
-                self.check_trailing_profit()
+                # One positions snapshot feeds both the P&L labels and the trailing check
+                positions = self.fetch_positions()
+                self.update_pnl(positions)
+                self.check_trailing_profit(positions)
+                backoff = 30
                 time.sleep(10)
             except Exception as e:
                 self.log_message(f"Error updating P&L: {e}")
-                time.sleep(30)
+                backoff = _backoff_sleep(backoff)
     
-    def update_pnl(self):
+    def update_pnl(self, positions=None):
         if not self.is_logged_in:
             return
         try:
-            positions = self.kite.positions()
+            if positions is None:
+                positions = self.fetch_positions()
             total_pnl = 0
             day_pnl = 0
             realized_pnl = 0
@@ -4627,12 +5372,16 @@ class ZerodhaTradingApp:
             for position in positions['day']:
                 realized_pnl += position.get('realised', 0)
             self.total_pnl = total_pnl
+            self.check_profit_target()
+            # Format once here; the Tk pass only configures labels when the text actually moved
+            texts = (f"Total P&L: ₹{total_pnl:.2f}", f"Day P&L: ₹{day_pnl:.2f}", f"Realized P&L: ₹{realized_pnl:.2f}")
+            if texts == self.pnl_label_texts:
+                return
+            self.pnl_label_texts = texts
             def update_gui():
-                self.total_pnl_label.config(text=f"Total P&L: ₹{total_pnl:.2f}")
-                self.day_pnl_label.config(text=f"Day P&L: ₹{day_pnl:.2f}")
-                self.realized_pnl_label.config(text=f"Realized P&L: ₹{realized_pnl:.2f}")
-                color = 'green' if total_pnl >= 0 else 'red'
-                self.total_pnl_label.config(foreground=color)
+                self.total_pnl_label.config(text=texts[0], foreground='green' if total_pnl >= 0 else 'red')
+                self.day_pnl_label.config(text=texts[1])
+                self.realized_pnl_label.config(text=texts[2])
             self.root.after(0, update_gui)
         except Exception as e:
             self.log_message(f"Error updating P&L: {e}")
@@ -4644,25 +5393,28 @@ class ZerodhaTradingApp:
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid profit target")
     
-    def monitor_profit_target(self):
-        while self.is_logged_in:
-            try:
-                if self.profit_target > 0 and self.total_pnl >= self.profit_target:
-                    self.log_message(f"Profit target reached! Total P&L: ₹{self.total_pnl}")
-                    self.auto_exit_positions()
-                    self.profit_target = 0
-                time.sleep(10)
-            except Exception as e:
-                self.log_message(f"Error monitoring profit target: {e}")
-                time.sleep(30)
-    
-    def check_trailing_profit(self):
+    def check_profit_target(self):
+        """Run on every P&L update rather than on a separate polling thread"""
+        if self.profit_target > 0 and self.total_pnl >= self.profit_target:
+            self.log_message(f"Profit target reached! Total P&L: ₹{self.total_pnl}")
+            # The target stays armed when another batch holds the order slot, so the next P&L update retries
+            if self.auto_exit_positions():
+                self.profit_target = 0
+    
+    def _trailing_stop_paise(self, peak_pnl):
+        """Trailing stop level for a peak P&L, in integer paise"""
+        if self.trailing_type == "points":
+            return round((peak_pnl - self.trailing_value) * 100)
+        return round(peak_pnl * (100 - self.trailing_value))
+    
+    def check_trailing_profit(self, positions=None):
         if not self.is_logged_in or not self.trailing_enabled:
             return
         if not self.update_trailing_settings():
             return
         try:
-            positions = self.kite.positions()
+            if positions is None:
+                positions = self.fetch_positions()
             net_positions = positions['net']
             current_symbols = {p['tradingsymbol'] for p in net_positions if p['quantity'] != 0}
             for symbol in list(self.trailing_positions.keys()):
@@ -4684,15 +5436,10 @@ class ZerodhaTradingApp:
                 else:
                     if pnl > track['peak_pnl']:
                         track['peak_pnl'] = pnl
-                    if self.trailing_type == "points":
-                        if pnl <= track['peak_pnl'] - self.trailing_value:
-                            self.log_message(f"Trailing stop triggered for {symbol}: peak ₹{track['peak_pnl']:.2f}, current ₹{pnl:.2f}")
-                            self.exit_position(position)
-                    else:
-                        threshold = track['peak_pnl'] * (1 - self.trailing_value / 100)
-                        if pnl <= threshold:
-                            self.log_message(f"Trailing stop triggered for {symbol}: peak ₹{track['peak_pnl']:.2f}, current ₹{pnl:.2f}")
-                            self.exit_position(position)
+                    # Compare in integer paise so the trigger has no float round-off at the stop level
+                    if round(pnl * 100) <= self._trailing_stop_paise(track['peak_pnl']):
+                        self.log_message(f"Trailing stop triggered for {symbol}: peak ₹{track['peak_pnl']:.2f}, current ₹{pnl:.2f}")
+                        self.exit_position(position)
         except Exception as e:
             self.log_message(f"Error in trailing profit check: {e}")
     
@@ -4700,44 +5447,53 @@ class ZerodhaTradingApp:
         try:
             transaction = 'SELL' if position['quantity'] > 0 else 'BUY'
             quantity = abs(position['quantity'])
-            order_id = self.kite.place_order(
-                variety=self.kite.VARIETY_REGULAR,
-                exchange=position['exchange'],
-                tradingsymbol=position['tradingsymbol'],
-                transaction_type=transaction,
-                quantity=quantity,
-                order_type=self.kite.ORDER_TYPE_MARKET,
-                product=self.kite.PRODUCT_NRML
-            )
+            order_id = self.kite.place_order(**self._order_params(position['exchange'], position['tradingsymbol'], transaction, quantity))
             self.log_message(f"Trailing exit: {position['tradingsymbol']} {transaction} {quantity} - Order ID: {order_id}")
+            self.log_trade(position['exchange'], position['tradingsymbol'], transaction, quantity, "MARKET", None, order_id)
             if position['tradingsymbol'] in self.trailing_positions:
                 del self.trailing_positions[position['tradingsymbol']]
         except Exception as e:
             self.log_message(f"Error exiting position {position['tradingsymbol']}: {e}")
     
     def auto_exit_positions(self):
+        """Square off every open position from a non-Tk thread; False when another batch holds the order slot"""
+        if not self.is_logged_in:
+            return False
+        # Two exits sized from the same positions read would double every square-off order
+        if not self._claim_order_batch('auto_exit_positions'):
+            self.log_message("Auto exit skipped: previous orders are still being placed")
+            return False
+        try:
+            self._exit_all_positions()
+        finally:
+            self._release_order_batch()
+        return True
+    
+    def _exit_all_positions(self):
         if not self.is_logged_in:
             return
         try:
             positions = self.kite.positions()
+            exits = [(position, 'SELL' if position['quantity'] > 0 else 'BUY', abs(position['quantity']))
+                     for position in positions['net'] if position['quantity'] != 0]
+            # Every exit is in flight at once; _pace_order only spaces the submissions, so a
+            # slow round-trip on one position no longer delays the rest
+            futures = [
+                self.io_executor.submit(self._paced_place_order,
+                                        self._order_params(position['exchange'], position['tradingsymbol'], transaction, quantity))
+                for position, transaction, quantity in exits
+            ]
             orders_placed = 0
-            for position in positions['net']:
-                if position['quantity'] != 0:
-                    transaction = 'SELL' if position['quantity'] > 0 else 'BUY'
-                    quantity = abs(position['quantity'])
-                    order_id = self.kite.place_order(
-                        variety=self.kite.VARIETY_REGULAR,
-                        exchange=position['exchange'],
-                        tradingsymbol=position['tradingsymbol'],
-                        transaction_type=transaction,
-                        quantity=quantity,
-                        order_type=self.kite.ORDER_TYPE_MARKET,
-                        product=self.kite.PRODUCT_NRML
-                    )
-                    orders_placed += 1
-                    self.log_message(f"Auto exit: {position['tradingsymbol']} {transaction} {quantity} - Order ID: {order_id}")
-                    if position['tradingsymbol'] in self.trailing_positions:
-                        del self.trailing_positions[position['tradingsymbol']]
+            for (position, transaction, quantity), future in zip(exits, futures):
+                try:
+                    order_id = future.result()
+                except Exception as e:
+                    self.log_message(f"Error in auto exit for {position['tradingsymbol']}: {e}")
+                    continue
+                orders_placed += 1
+                self.log_message(f"Auto exit: {position['tradingsymbol']} {transaction} {quantity} - Order ID: {order_id}")
+                self.log_trade(position['exchange'], position['tradingsymbol'], transaction, quantity, "MARKET", None, order_id)
+                self.trailing_positions.pop(position['tradingsymbol'], None)
             if orders_placed > 0:
                 self.log_message(f"Auto exit completed for {orders_placed} positions")
             else:
@@ -4746,40 +5502,96 @@ class ZerodhaTradingApp:
             self.log_message(f"Error in auto exit: {e}")
     
     # ---------- Logging methods ----------
+    def log_trade(self, exchange, symbol, transaction, quantity, order_type, price, order_id):
+        """Queue a placed order for the CSV trade log; the disk write happens on the writer thread"""
+        self._queue_log_row(TRADE_LOG_FILE, TRADE_LOG_HEADER,
+                            [datetime.now().isoformat(), exchange, symbol, transaction,
+                             quantity, order_type, price if price is not None else '', order_id])
+    
+    def log_spread_trade(self, action, exchange, buy_leg, sell_leg, combined_pnl=None):
+        """Queue one spread-log row covering both legs of a spread entry or exit"""
+        row = [datetime.now().isoformat(), action, exchange]
+        for leg in (buy_leg, sell_leg):
+            row += [leg.get('symbol', ''), leg.get('quantity', ''), leg.get('order_type', ''),
+                    leg.get('price') if leg.get('price') is not None else '', leg.get('order_id', '')]
+        row.append(combined_pnl if combined_pnl is not None else '')
+        self._queue_log_row(SPREAD_LOG_FILE, SPREAD_LOG_HEADER, row)
+    
+    def _queue_log_row(self, path, header, row):
+        """Hand a CSV row to the log writer thread, starting it on first use"""
+        with self.trade_log_lock:
+            if self.trade_log_thread is None:
+                self.trade_log_thread = threading.Thread(target=self._trade_log_writer_loop, daemon=True)
+                self.trade_log_thread.start()
+                atexit.register(self._stop_trade_log_writer)
+        self.trade_log_queue.put((path, header, row))
+    
+    def _trade_log_writer_loop(self):
+        """Drain queued rows to their CSV files until the None sentinel arrives"""
+        writers = {}
+        files = []
+        try:
+            while True:
+                item = self.trade_log_queue.get()
+                if item is None:
+                    break
+                path, header, row = item
+                try:
+                    writer = writers.get(path)
+                    if writer is None:
+                        write_header = not os.path.exists(path)
+                        # Line buffering flushes every row so a crash loses nothing already dequeued
+                        f = open(path, 'a', newline='', buffering=1)
+                        files.append(f)
+                        writer = writers[path] = csv.writer(f)
+                        if write_header:
+                            writer.writerow(header)
+                    writer.writerow(row)
+                except Exception as e:
+                    self.log_message(f"Error writing {path}: {e}")
+        finally:
+            for f in files:
+                f.close()
+    
+    def _stop_trade_log_writer(self):
+        """Flush pending log rows on shutdown"""
+        self.trade_log_queue.put(None)
+        self.trade_log_thread.join(timeout=5)
+    
+    def _append_log(self, widget_name, message):
+        """Buffer a timestamped line for a log widget; one after_idle pass writes every pending line"""
+        line = f"[{datetime.now().strftime('%H:%M:%S')}] {message}\n"
+        with self.log_lock:
+            self.pending_logs.setdefault(widget_name, []).append(line)
+            if self.log_flush_scheduled:
+                return
+            self.log_flush_scheduled = True
+        self.root.after_idle(self._flush_logs)
+    
+    def _flush_logs(self):
+        with self.log_lock:
+            pending = self.pending_logs
+            self.pending_logs = {}
+            self.log_flush_scheduled = False
+        for widget_name, lines in pending.items():
+            widget = getattr(self, widget_name)
+            widget.insert(tk.END, ''.join(lines))
+            widget.see(tk.END)
+    
     def log_message(self, message):
-        def update_log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.market_data_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.market_data_text.see(tk.END)
-        self.root.after(0, update_log)
+        self._append_log('market_data_text', message)
     
     def log_futures_message(self, message):
-        def update_log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.futures_orders_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.futures_orders_text.see(tk.END)
-        self.root.after(0, update_log)
+        self._append_log('futures_orders_text', message)
     
     def log_options_message(self, message):
-        def update_log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.options_orders_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.options_orders_text.see(tk.END)
-        self.root.after(0, update_log)
+        self._append_log('options_orders_text', message)
     
     def log_nfo_options_message(self, message):
-        def update_log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.nfo_options_orders_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.nfo_options_orders_text.see(tk.END)
-        self.root.after(0, update_log)
+        self._append_log('nfo_options_orders_text', message)
     
     def log_nse_options_message(self, message):
-        def update_log():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.nse_options_orders_text.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.nse_options_orders_text.see(tk.END)
-        self.root.after(0, update_log)
+        self._append_log('nse_options_orders_text', message)
 
 def main():
     root = tk.Tk()